@@ -37,6 +37,16 @@ module "prowler_scan" {
   container_name               = var.container_name
   allowed_ips                  = var.allowed_ips
   dashboard_uptime             = var.dashboard_uptime
+  dashboard_warm_pool          = var.dashboard_warm_pool
+  dashboard_report_scope       = var.dashboard_report_scope
+  dashboard_report_days        = var.dashboard_report_days
+  scan_concurrency             = var.scan_concurrency
+  critical_accounts            = var.critical_accounts
+  run_task_concurrency         = var.run_task_concurrency
+  auto_sizing_max_cpu          = var.auto_sizing_max_cpu
+  notify_only_changes          = var.notify_only_changes
+  notification_batching        = var.notification_batching
+  notification_batch_timeout   = var.notification_batch_timeout
   dashboard_frontend_url       = module.prowler_launch_website.url
   report_retention             = var.report_retention
   prowler_ami                  = var.prowler_ami
@@ -5,6 +5,8 @@ resource "aws_lb_target_group" "dashboard" {
   target_type = "instance"
   vpc_id      = var.vpc_id
 
+  deregistration_delay = 60
+
   health_check {
     path                = "/"
     port                = "11666"
@@ -0,0 +1,260 @@
+"""Replay API Gateway events against the API Lambda for synthetic organisations.
+
+Each organisation size runs in a fresh interpreter with AWS answered in-process
+by fake_aws.FakeAws. Every route is replayed as an API Gateway REST (v1) and
+HTTP API (v2) event. The harness reports latency, AWS calls per request and
+the peak Python allocation per request, so scaling changes to start-task,
+check-task-status and the dashboard routes can be checked without an AWS
+account.
+
+Usage: python prowler_scan/benchmarks/api_load.py [--accounts 10,100,1000] [--iterations N] [--format v1|v2|both]
+"""
+
+import argparse
+import base64
+import gc
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import urlencode
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_aws  # noqa: E402
+from lambda_cold_start import API_ENV, COMMON_ENV, LAMBDA_ROOT, dashboard_instance  # noqa: E402
+
+STAGE = "prod"
+
+
+def rest_event(method, route, params=None, body=None, headers=None):
+    """API Gateway REST API (payload format 1.0) proxy event."""
+    return {
+        "resource": f"/{route}",
+        "path": f"/{route}",
+        "httpMethod": method,
+        "headers": {"Authorization": "Bearer token", "Content-Type": "application/json", **(headers or {})},
+        "queryStringParameters": params,
+        "requestContext": {"stage": STAGE, "httpMethod": method, "resourcePath": f"/{route}"},
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+def http_event(method, route, params=None, body=None, headers=None):
+    """API Gateway HTTP API (payload format 2.0) event; headers are lower case."""
+    event = {
+        "version": "2.0",
+        "routeKey": f"{method} /{route}",
+        "rawPath": f"/{STAGE}/{route}",
+        "rawQueryString": urlencode(params or {}),
+        "headers": {key.lower(): value for key, value in {"Authorization": "Bearer token", **(headers or {})}.items()},
+        "requestContext": {"stage": STAGE, "http": {"method": method, "path": f"/{STAGE}/{route}"}},
+        "isBase64Encoded": body is not None,
+    }
+    if params:
+        event["queryStringParameters"] = params
+    if body is not None:
+        event["body"] = base64.b64encode(body.encode("utf-8")).decode("ascii")
+    return event
+
+
+EVENT_FORMATS = {"v1": rest_event, "v2": http_event}
+
+
+def setup_job(fake):
+    accounts = len(fake.accounts)
+    fake.job = {
+        "job_id": uuid.uuid4().hex,
+        "sk": "job",
+        "task_count": accounts,
+        "queued": 0,
+        "pending": 0,
+        "running": accounts // 3,
+        "succeeded": accounts - accounts // 3,
+        "failed": 0,
+        "findings": 0,
+    }
+
+
+def task_arns_param(fake):
+    return json.dumps([fake_aws.task_arn(index) for index in range(len(fake.accounts))])
+
+
+def etag_of(module, make_event, fake, params):
+    response = module.lambda_handler(make_event("GET", "check-task-status", params(fake)), None)
+    return response["headers"]["ETag"]
+
+
+# name -> (setup(fake) or None, request(make_event, fake, module) -> event, expected status code)
+SCENARIOS = {
+    "start-task": (
+        None,
+        lambda make_event, fake, module: make_event("POST", "start-task", body="{}"),
+        200,
+    ),
+    "start-task (subset)": (
+        None,
+        lambda make_event, fake, module: make_event(
+            "POST", "start-task", body=json.dumps({"accounts": fake.accounts[:10]})
+        ),
+        200,
+    ),
+    "check-task-status (job)": (
+        setup_job,
+        lambda make_event, fake, module: make_event("GET", "check-task-status", {"jobId": fake.job["job_id"]}),
+        200,
+    ),
+    "check-task-status (job, 304)": (
+        setup_job,
+        lambda make_event, fake, module: make_event(
+            "GET", "check-task-status", {"jobId": fake.job["job_id"]},
+            headers={"If-None-Match": etag_of(module, make_event, fake, lambda f: {"jobId": f.job["job_id"]})},
+        ),
+        304,
+    ),
+    "check-task-status (arns)": (
+        None,
+        lambda make_event, fake, module: make_event("GET", "check-task-status", {"taskArn": task_arns_param(fake)}),
+        200,
+    ),
+    "task state change": (
+        setup_job,
+        lambda make_event, fake, module: {
+            "source": "aws.ecs",
+            "detail-type": "ECS Task State Change",
+            "detail": {
+                "taskArn": fake_aws.task_arn(0),
+                "taskDefinitionArn": fake_aws.task_definition_arn(fake.accounts[0]),
+                "startedBy": fake.job["job_id"],
+                "lastStatus": "RUNNING",
+                "version": 2,
+                "containers": [],
+            },
+        },
+        None,
+    ),
+    "launch-dashboard": (
+        lambda fake: fake.instances.clear(),
+        lambda make_event, fake, module: make_event("POST", "launch-dashboard"),
+        200,
+    ),
+    "check-dashboard-status": (
+        lambda fake: fake.instances.append(dashboard_instance(timedelta(minutes=5))),
+        lambda make_event, fake, module: make_event("GET", "check-dashboard-status"),
+        200,
+    ),
+}
+
+
+def run_scale(accounts, iterations, formats):
+    """Replay every scenario for one organisation size in this process."""
+    os.environ.update(COMMON_ENV)
+    os.environ.update(API_ENV)
+    # Measure the work behind every poll rather than the in-container status cache.
+    os.environ.setdefault("STATUS_CACHE_TTL", "0")
+    sys.path.insert(0, os.path.join(LAMBDA_ROOT, "shared"))
+    sys.path.insert(0, os.path.join(LAMBDA_ROOT, "prowler_lambda"))
+
+    fake = fake_aws.FakeAws(accounts)
+    fake.add_reports(rows=5)
+    fake.install()
+    module = importlib.import_module("lambda_function")
+
+    results = []
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        for name, (setup, request, expected) in SCENARIOS.items():
+            if setup:
+                setup(fake)
+            for event_format in formats:
+                make_event = EVENT_FORMATS[event_format]
+                # Events are built up front, so setup calls such as the ETag lookup are not measured.
+                events = [request(make_event, fake, module) for _ in range(iterations + 1)]
+
+                latencies, calls, statuses = [], Counter(), Counter()
+                for event in events[:iterations]:
+                    fake.reset_counts()
+                    started = time.perf_counter()
+                    response = module.lambda_handler(event, None)
+                    latencies.append(time.perf_counter() - started)
+                    calls.update(fake.calls)
+                    statuses[response.get("statusCode") if isinstance(response, dict) else None] += 1
+
+                gc.collect()
+                tracemalloc.start()
+                module.lambda_handler(events[-1], None)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                status = statuses.most_common(1)[0][0]
+                results.append({
+                    "scenario": name,
+                    "format": event_format,
+                    "status": status,
+                    "ok": expected is None or set(statuses) == {expected},
+                    "p50_ms": statistics.median(latencies) * 1000,
+                    "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000,
+                    "calls": sum(calls.values()) / iterations,
+                    "top_calls": [
+                        [operation, count / iterations] for operation, count in calls.most_common(3)
+                    ],
+                    "peak_kb": peak / 1024,
+                })
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return {
+        "accounts": accounts,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", default="10,100,1000", help="comma-separated organisation sizes")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--format", choices=["v1", "v2", "both"], default="both")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    formats = ["v1", "v2"] if args.format == "both" else [args.format]
+
+    if args.child:
+        print(json.dumps(run_scale(args.child, args.iterations, formats)))
+        return
+
+    failed = False
+    for accounts in (int(value) for value in args.accounts.split(",")):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", str(accounts),
+             "--iterations", str(args.iterations), "--format", args.format],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        scale = json.loads(output.strip().splitlines()[-1])
+        print(f"\n{accounts} accounts (max RSS {scale['max_rss_mb']:.1f} MB)")
+        print(f"{'Scenario':<30} {'fmt':<3} {'status':>6} {'p50':>9} {'p95':>9} {'calls':>7} {'peak KB':>9}  top calls")
+        for result in scale["results"]:
+            failed |= not result["ok"]
+            top = ", ".join(f"{operation} x{count:g}" for operation, count in result["top_calls"])
+            print(
+                f"{result['scenario']:<30} {result['format']:<3} {str(result['status']):>6}{'' if result['ok'] else '!'} "
+                f"{result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['calls']:>7g} "
+                f"{result['peak_kb']:>9.1f}  {top}"
+            )
+    if failed:
+        sys.exit("Some requests returned an unexpected status code (marked with !).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Compare failed-check parsing in failed_task_lambda against the previous
+DictReader implementation on a synthetic Prowler CSV report.
+
+Usage: python prowler_scan/benchmarks/failed_checks_parsing.py [rows]
+"""
+
+import csv
+import io
+import itertools
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "failed_task_lambda")
+)
+
+import report_parsing  # noqa: E402
+
+HEADER = [
+    "AUTH_METHOD", "TIMESTAMP", "ACCOUNT_UID", "ACCOUNT_NAME", "FINDING_UID",
+    "PROVIDER", "CHECK_ID", "CHECK_TITLE", "CHECK_TYPE", "STATUS",
+    "STATUS_EXTENDED", "MUTED", "SERVICE_NAME", "SUBSERVICE_NAME", "SEVERITY",
+    "RESOURCE_TYPE", "RESOURCE_UID", "RESOURCE_NAME", "RESOURCE_DETAILS",
+    "RESOURCE_TAGS", "PARTITION", "REGION", "DESCRIPTION", "RISK",
+    "RELATED_URL", "REMEDIATION_RECOMMENDATION_TEXT", "COMPLIANCE",
+]
+SEVERITIES = ["critical", "high", "medium", "low", "informational"]
+REGIONS = ["eu-west-1", "eu-central-1", "us-east-1", "us-west-2", "ap-southeast-2"]
+
+
+def build_report(rows: int, fail_ratio: float = 0.3) -> str:
+    rng = random.Random(42)
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=";")
+    writer.writerow(HEADER)
+    for index in range(rows):
+        check = f"check_{index % 400}"
+        resource = f"arn:aws:s3:::bucket-{index}"
+        status = "FAIL" if rng.random() < fail_ratio else "PASS"
+        values = {
+            "CHECK_ID": check,
+            "CHECK_TITLE": f"Title for {check}",
+            "STATUS": status,
+            "STATUS_EXTENDED": f"{check} {status.lower()}ed for {resource}",
+            "SEVERITY": rng.choice(SEVERITIES),
+            "RESOURCE_UID": resource,
+            "REGION": rng.choice(REGIONS),
+            "DESCRIPTION": "Lorem ipsum dolor sit amet " * 4,
+        }
+        writer.writerow([values.get(column, "x") for column in HEADER])
+    return out.getvalue()
+
+
+# Previous implementation, kept here only as the comparison baseline.
+def _legacy_normalize_key(key):
+    if not key:
+        return ""
+    return re.sub(r"[\s_]", "", key.strip().lower())
+
+
+def _legacy_status_is_fail(row):
+    for key, value in row.items():
+        if key is None:
+            continue
+        if _legacy_normalize_key(key) == "status":
+            return "FAIL" in (value or "").upper()
+    concatenated = " ".join(v for v in row.values() if isinstance(v, str)).upper()
+    return "FAIL" in concatenated
+
+
+def _legacy_format_failed_row(row):
+    normalized = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key_lower = key.strip().lower()
+        norm_key = _legacy_normalize_key(key)
+        if norm_key not in normalized or not normalized[norm_key]:
+            normalized[norm_key] = (value or "").strip()
+        if key_lower not in normalized or not normalized[key_lower]:
+            normalized[key_lower] = (value or "").strip()
+    check_id = normalized.get("checkid") or "Unknown check"
+    severity = normalized.get("severity") or ""
+    title = normalized.get("checktitle") or ""
+    region = normalized.get("region") or "N/A"
+    resource = normalized.get("resourceuid") or ""
+    detail = normalized.get("statusextended") or ""
+    headline = f"{check_id} [{severity}] {title}"
+    summary = detail or headline
+    if resource and resource not in summary:
+        summary = f"{summary} ({resource})"
+    return f"{summary}\n  Region: {region}"
+
+
+def legacy_parse(text: str, limit: int) -> tuple[list[str], int]:
+    reader = csv.DictReader(io.StringIO(text), delimiter=";")
+    failed, count = [], 0
+    for row in reader:
+        if row and _legacy_status_is_fail(row):
+            count += 1
+            if len(failed) < limit:
+                failed.append(_legacy_format_failed_row(row))
+    return failed, count
+
+
+def schema_parse(text: str, limit: int) -> tuple[list[str], int]:
+    reader = csv.reader(io.StringIO(text), delimiter=";")
+    schema = report_parsing.ReportSchema.from_header(next(reader))
+    failed, count = [], 0
+    for row in reader:
+        if row and report_parsing.status_is_fail(row, schema):
+            count += 1
+            if len(failed) < limit:
+                failed.append(report_parsing.format_failed_row(row, schema))
+    return failed, count
+
+
+def timed(func, *args, repeat: int = 3) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in itertools.repeat(None, repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    text = build_report(rows)
+    print(f"Report: {rows} rows, {len(text) / 1_000_000:.1f} MB")
+
+    legacy_time, (_, legacy_count) = timed(legacy_parse, text, 20)
+    schema_time, (_, schema_count) = timed(schema_parse, text, 20)
+    assert legacy_count == schema_count, (legacy_count, schema_count)
+
+    print(f"DictReader + per-row normalization: {legacy_time:.3f}s")
+    print(f"csv.reader + ReportSchema:          {schema_time:.3f}s")
+    print(f"Speed-up: {legacy_time / schema_time:.1f}x ({schema_count} failed rows)")
+
+
+if __name__ == "__main__":
+    main()
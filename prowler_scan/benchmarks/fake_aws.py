@@ -0,0 +1,233 @@
+"""In-process stand-in for the AWS APIs called by the Lambdas, for benchmarks.
+
+``FakeAws.install()`` replaces ``BaseClient._make_api_call``, so clients are
+still created as usual (including loading their service models, which is part
+of a cold start) but no request leaves the process. Responses are returned in
+their parsed form, as botocore hands them to the caller.
+"""
+
+import io
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import botocore.client
+from botocore.response import StreamingBody
+
+REGION = "eu-west-1"
+TASK_FAMILY_PREFIX = "prowler-default-"
+REPORT_HEADER = [
+    "CHECK_ID", "CHECK_TITLE", "STATUS", "STATUS_EXTENDED", "SERVICE_NAME",
+    "SEVERITY", "RESOURCE_UID", "REGION",
+]
+SEVERITIES = ["critical", "high", "medium", "low"]
+
+
+def account_ids(count: int) -> list[str]:
+    return [f"{100000000000 + index}" for index in range(count)]
+
+
+def task_definition_arn(account: str) -> str:
+    return f"arn:aws:ecs:{REGION}:123456789012:task-definition/{TASK_FAMILY_PREFIX}{account}:1"
+
+
+def task_arn(index: int) -> str:
+    return f"arn:aws:ecs:{REGION}:123456789012:task/prowler/{index:032x}"
+
+
+def build_report(rows: int, seed: int = 0) -> bytes:
+    """A Prowler CSV report with a third of its checks failing."""
+    lines = [";".join(REPORT_HEADER)]
+    for index in range(rows):
+        status = "FAIL" if (index + seed) % 3 == 0 else "PASS"
+        check = f"check_{index % 50}"
+        resource = f"arn:aws:s3:::bucket-{index}"
+        lines.append(";".join([
+            check, f"Title of {check}", status, f"{check} {status} for {resource}", "s3",
+            SEVERITIES[index % len(SEVERITIES)], resource, REGION,
+        ]))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def build_summary(account: str, report_key: str, seed: int = 0) -> bytes:
+    return json.dumps({
+        "account": account,
+        "report_key": report_key,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "totals": {"rows": 300, "fail": 100 + seed},
+        "fail_by_severity": {"critical": 10 + seed, "high": 40, "medium": 50},
+        "fail_by_check": {f"check_{index}": 2 for index in range(50)},
+        "failed_examples": [f"check_{index} failed" for index in range(20)],
+    }).encode("utf-8")
+
+
+class FakeAws:
+    """Canned responses per (service, operation), with call counts.
+
+    ``objects`` is a tiny S3 bucket shared by all buckets, ``instances`` the
+    EC2 instances returned by DescribeInstances and ``active_tasks`` the ECS
+    tasks that are not stopped. ``overrides`` maps (service, operation) to a
+    response or a callable(params) returning one.
+    """
+
+    def __init__(self, accounts: int = 20):
+        self.accounts = account_ids(accounts)
+        self.objects: dict[str, tuple[bytes, datetime]] = {}
+        self.instances: list[dict] = []
+        self.active_tasks: list[str] = []
+        self.job: dict | None = None
+        self.overrides: dict = {}
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._next_task = 0
+
+    def put(self, key: str, body: bytes, last_modified: datetime | None = None) -> None:
+        self.objects[key] = (body, last_modified or datetime.now(timezone.utc))
+
+    def put_report(self, key: str, rows: int, seed: int = 0, last_modified: datetime | None = None) -> None:
+        self.put(key, build_report(rows, seed), last_modified)
+
+    def add_reports(self, rows: int = 300) -> None:
+        """Two scans per account, with summaries and the latest report index."""
+        now = datetime.now(timezone.utc)
+        for account in self.accounts:
+            # The newest report is the one a task that just stopped wrote.
+            for seed, age in ((0, 1), (1, 0)):
+                stamp = (now - timedelta(days=age)).strftime("%Y%m%d%H%M%S")
+                key = f"output/csv/prowler-output-{account}-{stamp}.csv"
+                self.put_report(key, rows, seed, now - timedelta(days=age))
+                self.put(
+                    f"output/summary/prowler-output-{account}-{stamp}.json",
+                    build_summary(account, key, seed),
+                    now - timedelta(days=age),
+                )
+            entry = {"key": key, "last_modified": now.strftime("%Y-%m-%dT%H:%M:%SZ")}
+            self.put(f"index/latest/{account}.json", json.dumps(entry).encode("utf-8"))
+
+    def install(self) -> None:
+        fake = self
+
+        def make_api_call(client, operation_name, api_params):
+            return fake.call(client, operation_name, api_params)
+
+        botocore.client.BaseClient._make_api_call = make_api_call
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def call(self, client, operation: str, params: dict) -> dict:
+        service = client.meta.service_model.service_name
+        with self._lock:
+            self.calls[f"{service}.{operation}"] += 1
+        override = self.overrides.get((service, operation))
+        if override is not None:
+            return override(params) if callable(override) else override
+        handler = getattr(self, f"_{service}_{operation}", None)
+        return handler(client, params) if handler else {}
+
+    # ECS
+
+    def _ecs_ListTaskDefinitions(self, client, params):
+        return {"taskDefinitionArns": [task_definition_arn(account) for account in self.accounts]}
+
+    def _ecs_ListTasks(self, client, params):
+        return {"taskArns": list(self.active_tasks)}
+
+    def _ecs_DescribeTasks(self, client, params):
+        return {"tasks": [
+            {
+                "taskArn": arn,
+                "lastStatus": "RUNNING",
+                "taskDefinitionArn": task_definition_arn(self.accounts[index % len(self.accounts)]),
+            }
+            for index, arn in enumerate(params["tasks"])
+        ]}
+
+    def _ecs_RunTask(self, client, params):
+        with self._lock:
+            self._next_task += 1
+            index = self._next_task
+        return {"tasks": [{"taskArn": task_arn(index)}], "failures": []}
+
+    # DynamoDB (resource calls arrive here with plain Python values)
+
+    def _dynamodb_GetItem(self, client, params):
+        # Only the job item of a scan job is kept; task items start out missing.
+        if self.job and params["Key"].get("sk", "job") == "job":
+            return {"Item": self.job}
+        return {}
+
+    def _dynamodb_UpdateItem(self, client, params):
+        return {"Attributes": self.job or {}}
+
+    def _dynamodb_Query(self, client, params):
+        return {"Items": [], "Count": 0}
+
+    def _dynamodb_BatchWriteItem(self, client, params):
+        return {"UnprocessedItems": {}}
+
+    def _dynamodb_Scan(self, client, params):
+        return {"Items": []}
+
+    # S3
+
+    def _s3_ListObjectsV2(self, client, params):
+        prefix = params.get("Prefix", "")
+        contents = [
+            {"Key": key, "LastModified": modified, "ETag": f'"{hash(body) & 0xffffffff:x}"', "Size": len(body)}
+            for key, (body, modified) in sorted(self.objects.items())
+            if key.startswith(prefix)
+        ]
+        return {"Contents": contents, "KeyCount": len(contents), "IsTruncated": False}
+
+    def _s3_GetObject(self, client, params):
+        if params["Key"] not in self.objects:
+            raise client.exceptions.NoSuchKey(
+                {"Error": {"Code": "NoSuchKey", "Message": "The specified key does not exist."}},
+                "GetObject",
+            )
+        body, modified = self.objects[params["Key"]]
+        return {
+            "Body": StreamingBody(io.BytesIO(body), len(body)),
+            "ContentLength": len(body),
+            "LastModified": modified,
+            "ETag": f'"{hash(body) & 0xffffffff:x}"',
+        }
+
+    def _s3_PutObject(self, client, params):
+        body = params["Body"]
+        self.put(params["Key"], body if isinstance(body, bytes) else body.read())
+        return {"ETag": '"0"'}
+
+    # EC2 and ELB
+
+    def _ec2_DescribeInstances(self, client, params):
+        return {"Reservations": [{"Instances": [instance]} for instance in self.instances]}
+
+    def _ec2_RunInstances(self, client, params):
+        return {"Instances": [{"InstanceId": "i-0123456789abcdef0"}]}
+
+    def _elbv2_DescribeTargetHealth(self, client, params):
+        return {"TargetHealthDescriptions": [
+            {"Target": {"Id": instance["InstanceId"], "Port": 11666}, "TargetHealth": {"State": "healthy"}}
+            for instance in self.instances
+        ]}
+
+    def _elbv2_DescribeTargetGroupAttributes(self, client, params):
+        return {"Attributes": [{"Key": "deregistration_delay.timeout_seconds", "Value": "0"}]}
+
+    # CloudWatch Logs and SNS
+
+    def _logs_StartQuery(self, client, params):
+        return {"queryId": "query"}
+
+    def _logs_GetQueryResults(self, client, params):
+        return {"status": "Complete", "results": [
+            [{"field": "Account", "value": account}, {"field": "maxRuntimeSeconds", "value": "1800"}]
+            for account in self.accounts
+        ]}
+
+    def _sns_Publish(self, client, params):
+        return {"MessageId": "message"}
@@ -0,0 +1,270 @@
+"""Import time, cold start and per-route latency of the Lambdas with AWS stubbed out.
+
+Every route runs in a fresh interpreter, so the first invocation pays for the
+boto3 clients it creates just like a cold Lambda container does. AWS calls are
+answered in-process by fake_aws.FakeAws; the numbers are the Python overhead of
+the handlers, not AWS latency.
+
+Usage: python prowler_scan/benchmarks/lambda_cold_start.py [--iterations N] [--accounts N] [--only LAMBDA]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+COMMON_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "eu-west-1",
+    "AWS_EC2_METADATA_DISABLED": "true",
+    "REPORT_BUCKET": "prowler-reports",
+}
+API_ENV = {
+    "CLUSTER": "prowler",
+    "SUBNET": "subnet-0123456789abcdef0",
+    "DASHBOARD_LAUNCH_TEMPLATE": "prowler-dashboard",
+    "DASHBOARD_UPTIME": "1h",
+    "DASHBOARD_TG_ARN": "arn:aws:elasticloadbalancing:eu-west-1:123456789012:targetgroup/dashboard/0",
+    "DASHBOARD_ALB_DNS": "dashboard.example.com",
+    "TASK_FAMILY_PREFIXES": json.dumps(["prowler-default-"]),
+    "JOB_TABLE": "prowler_jobs",
+    "AWS_MAX_POOL_CONNECTIONS": "25",
+    "METRICS_LOG_GROUPS": json.dumps(["/aws/lambda/prowler-notifier"]),
+}
+NOTIFIER_ENV = {
+    "TOPICARN": "arn:aws:sns:eu-west-1:123456789012:prowler",
+    "FRONTEND_URL": "https://prowler.example.com",
+}
+DASHBOARD_ENV = {
+    "TARGET_GROUP_ARN": API_ENV["DASHBOARD_TG_ARN"],
+}
+
+
+def api_event(method, path, params=None, body=None):
+    return {
+        "httpMethod": method,
+        "path": path,
+        "queryStringParameters": params,
+        "body": body,
+    }
+
+
+def dashboard_instance(launched_ago, state="running"):
+    return {
+        "InstanceId": "i-0123456789abcdef0",
+        "State": {"Name": state},
+        "LaunchTime": datetime.now(timezone.utc) - launched_ago,
+        "Tags": [
+            {"Key": "Name", "Value": "dashboard-instance"},
+            {"Key": "TerminateAfter", "Value": "1h"},
+        ],
+    }
+
+
+def task_stopped_event(fake, exit_code):
+    created = datetime.now(timezone.utc) - timedelta(minutes=30)
+    stamp = lambda delta: (created + delta).isoformat().replace("+00:00", "Z")  # noqa: E731
+    return {
+        "source": "aws.ecs",
+        "detail-type": "ECS Task State Change",
+        "detail": {
+            "taskArn": "arn:aws:ecs:eu-west-1:123456789012:task/prowler/0",
+            "taskDefinitionArn": f"arn:aws:ecs:eu-west-1:123456789012:task-definition/prowler-default-{fake.accounts[0]}:1",
+            "lastStatus": "STOPPED",
+            "cpu": "1024",
+            "memory": "2048",
+            "createdAt": stamp(timedelta()),
+            "pullStartedAt": stamp(timedelta(seconds=20)),
+            "startedAt": stamp(timedelta(seconds=60)),
+            "stoppedAt": stamp(timedelta(minutes=30)),
+            "containers": [{"name": "prowler", "exitCode": exit_code}],
+        },
+    }
+
+
+def setup_job(fake):
+    accounts = len(fake.accounts)
+    fake.job = {
+        "job_id": uuid.uuid4().hex,
+        "sk": "job",
+        "task_count": accounts,
+        "queued": 0,
+        "pending": 0,
+        "running": accounts // 2,
+        "succeeded": accounts - accounts // 2,
+        "failed": 0,
+        "findings": 0,
+    }
+
+
+# lambda name -> (directory, module, environment, {route: (setup(fake), event(fake))})
+LAMBDAS = {
+    "api": ("prowler_lambda", "lambda_function", API_ENV, {
+        "options": (
+            None,
+            lambda fake: api_event("OPTIONS", "/start-task"),
+        ),
+        "start-task": (
+            lambda fake: fake.add_reports(rows=10),
+            lambda fake: api_event("POST", "/start-task", body="{}"),
+        ),
+        "check-task-status (job)": (
+            setup_job,
+            lambda fake: api_event("GET", "/check-task-status", {"jobId": fake.job["job_id"]}),
+        ),
+        "check-task-status (arns)": (
+            None,
+            lambda fake: api_event("GET", "/check-task-status", {
+                "taskArn": json.dumps([f"arn:aws:ecs:eu-west-1:123456789012:task/prowler/{i}" for i in range(len(fake.accounts))])
+            }),
+        ),
+        "findings-summary": (
+            lambda fake: fake.add_reports(rows=10),
+            lambda fake: api_event("GET", "/findings-summary", {"scans": "2"}),
+        ),
+        "scan-durations": (
+            None,
+            lambda fake: api_event("GET", "/scan-durations", {"days": "7"}),
+        ),
+        "launch-dashboard": (
+            None,
+            lambda fake: api_event("POST", "/launch-dashboard"),
+        ),
+        "check-dashboard-status": (
+            lambda fake: fake.instances.append(dashboard_instance(timedelta(minutes=5))),
+            lambda fake: api_event("GET", "/check-dashboard-status"),
+        ),
+    }),
+    "dashboard": ("dashboard_lambda", "lambda_function", DASHBOARD_ENV, {
+        "nothing expired": (
+            None,
+            lambda fake: {},
+        ),
+        "expired instance": (
+            lambda fake: fake.instances.append(dashboard_instance(timedelta(hours=2))),
+            lambda fake: {},
+        ),
+    }),
+    "notifier": ("failed_task_lambda", "lambda_function", NOTIFIER_ENV, {
+        "task succeeded": (
+            None,
+            lambda fake: task_stopped_event(fake, 0),
+        ),
+        "task with findings": (
+            lambda fake: fake.add_reports(),
+            lambda fake: task_stopped_event(fake, 3),
+        ),
+    }),
+    "report-summary": ("failed_task_lambda", "report_summary", NOTIFIER_ENV, {
+        "report created": (
+            lambda fake: fake.put_report("output/csv/prowler-output-100000000000-20260101000000.csv", 5000),
+            lambda fake: {"detail": {
+                "bucket": {"name": "prowler-reports"},
+                "object": {"key": "output/csv/prowler-output-100000000000-20260101000000.csv"},
+            }},
+        ),
+    }),
+}
+
+
+def run_route(lambda_name, route, iterations, accounts):
+    """Measure one route in this (fresh) process and return the results."""
+    directory, module_name, env, routes = LAMBDAS[lambda_name]
+    setup, make_event = routes[route]
+    os.environ.update(COMMON_ENV)
+    os.environ.update(env)
+    # The shared layer is on sys.path in Lambda.
+    sys.path.insert(0, os.path.join(LAMBDA_ROOT, "shared"))
+    sys.path.insert(0, os.path.join(LAMBDA_ROOT, directory))
+
+    started = time.perf_counter()
+    import boto3  # noqa: F401  The Lambdas import it at module level.
+    boto_import = time.perf_counter() - started
+
+    sys.path.insert(0, BENCHMARK_DIR)
+    import fake_aws
+
+    fake = fake_aws.FakeAws(accounts)
+    if setup:
+        setup(fake)
+    fake.install()
+
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    module_import = time.perf_counter() - started
+
+    # Handlers print their progress; keep stdout for the result line.
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        started = time.perf_counter()
+        response = module.lambda_handler(make_event(fake), None)
+        first_call = time.perf_counter() - started
+        first_calls = sum(fake.calls.values())
+
+        warm = []
+        for _ in range(iterations):
+            fake.reset_counts()
+            started = time.perf_counter()
+            module.lambda_handler(make_event(fake), None)
+            warm.append(time.perf_counter() - started)
+        warm_calls = sum(fake.calls.values())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return {
+        "status": response.get("statusCode", "-") if isinstance(response, dict) else "-",
+        "import_ms": (boto_import + module_import) * 1000,
+        "first_ms": first_call * 1000,
+        "cold_ms": (boto_import + module_import + first_call) * 1000,
+        "warm_p50_ms": statistics.median(warm) * 1000 if warm else None,
+        "first_calls": first_calls,
+        "warm_calls": warm_calls,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--only", choices=sorted(LAMBDAS))
+    parser.add_argument("--child", nargs=2, metavar=("LAMBDA", "ROUTE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_route(*args.child, args.iterations, args.accounts)))
+        return
+
+    print(f"{'Lambda':<15} {'Route':<26} {'status':>6} {'import':>8} {'1st call':>9} {'cold':>8} {'warm p50':>9} {'calls':>7} {'RSS MB':>7}")
+    for lambda_name, (_, _, _, routes) in LAMBDAS.items():
+        if args.only and lambda_name != args.only:
+            continue
+        for route in routes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", lambda_name, route,
+                 "--iterations", str(args.iterations), "--accounts", str(args.accounts)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            warm = f"{result['warm_p50_ms']:.2f}" if result["warm_p50_ms"] is not None else "-"
+            print(
+                f"{lambda_name:<15} {route:<26} {result['status']:>6} {result['import_ms']:>7.1f}ms {result['first_ms']:>7.1f}ms "
+                f"{result['cold_ms']:>6.1f}ms {warm:>7}ms {result['first_calls']:>3}/{result['warm_calls']:<3} "
+                f"{result['max_rss_mb']:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
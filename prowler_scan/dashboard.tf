@@ -12,7 +12,11 @@ resource "aws_launch_template" "compute" {
     security_groups             = [aws_security_group.dashboard_sg.id]
   }
   user_data = base64encode(templatefile("${path.module}/user_data.tftpl", {
-    bucket_name = var.prowler_report_bucket_name
+    bucket_name  = var.prowler_report_bucket_name
+    warm_pool    = var.dashboard_warm_pool
+    report_scope = var.dashboard_report_scope
+    report_days  = var.dashboard_report_days
+    index_prefix = local.report_index_prefix
   }))
 }
 
@@ -0,0 +1,25 @@
+resource "aws_cloudwatch_event_rule" "dashboard_running" {
+  name        = "prowler-dashboard-running"
+  description = "Register dashboard instances with the ALB once they are running"
+  event_pattern = jsonencode({
+    source      = ["aws.ec2"],
+    detail-type = ["EC2 Instance State-change Notification"],
+    detail = {
+      state = ["running"]
+    }
+  })
+}
+
+resource "aws_cloudwatch_event_target" "dashboard_running" {
+  rule      = aws_cloudwatch_event_rule.dashboard_running.name
+  target_id = "RegisterDashboardTarget"
+  arn       = module.lambda_prowler.lambda_function_arn
+}
+
+resource "aws_lambda_permission" "dashboard_running" {
+  statement_id  = "AllowDashboardStateFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_prowler.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.dashboard_running.arn
+}
@@ -10,6 +10,7 @@ module "lambda_terminate_dashboard" {
   memory_size = 128
   timeout     = 600
   runtime     = "python3.13"
+  layers      = [aws_lambda_layer_version.shared.arn]
 
   source_type               = "local"
   source_directory_location = "${path.module}/dashboard_lambda/"
@@ -44,9 +45,11 @@ data "aws_iam_policy_document" "terminate_dashboard" {
       "ec2:RunInstances",
       "ec2:DescribeInstances",
       "ec2:TerminateInstances",
+      "ec2:StopInstances",
       "elasticloadbalancing:DeregisterTargets",
       "elasticloadbalancing:DescribeTargetHealth",
-      "elasticloadbalancing:DescribeTargetGroups"
+      "elasticloadbalancing:DescribeTargetGroups",
+      "elasticloadbalancing:DescribeTargetGroupAttributes"
     ]
     resources = ["*"]
   }
@@ -1,17 +1,25 @@
-import boto3
 from datetime import datetime, timezone, timedelta
+import json
 import re
 import time
 import os
 
-ec2 = boto3.resource('ec2')
-elbv2 = boto3.client('elbv2')
+from aws_clients import client
+
+# Runs that find nothing to stop never create the load balancer client.
+ec2 = client('ec2')
+elbv2 = client('elbv2')
 
 target_group_arn = os.environ.get("TARGET_GROUP_ARN")  # Pass in via Lambda env var
-draining_wait_seconds = 60  # how long to wait before terminating
+dashboard_port = 11666
+dry_run_default = os.environ.get("DRY_RUN", "false").lower() == "true"
+drain_poll_seconds = 5
+# Stop waiting for draining this long before the Lambda would time out.
+timeout_margin_seconds = 30
+
 
 def parse_duration(value):
-    match = re.fullmatch(r"(\d+)([mhds])", value)
+    match = re.fullmatch(r"(\d+)([mhds])", value or "")
     if not match:
         return None
     num, unit = match.groups()
@@ -23,39 +31,111 @@ def parse_duration(value):
         "s": timedelta(seconds=num)
     }.get(unit)
 
+
+def find_expired_instances(now):
+    expired = []
+    paginator = ec2.get_paginator('describe_instances')
+    for page in paginator.paginate(Filters=[
+        {'Name': 'tag-key', 'Values': ['TerminateAfter']},
+        {'Name': 'instance-state-name', 'Values': ['running']}
+    ]):
+        for reservation in page['Reservations']:
+            for instance in reservation['Instances']:
+                tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                duration = parse_duration(tags.get("TerminateAfter"))
+                if duration is None:
+                    print(f"Invalid or missing duration on {instance['InstanceId']}, skipping.")
+                    continue
+
+                age = now - instance['LaunchTime']
+                if age >= duration:
+                    print(f"Instance {instance['InstanceId']} expired, age {age}, threshold {duration}")
+                    expired.append({
+                        "instanceId": instance['InstanceId'],
+                        "warmPool": tags.get("WarmPool") == "true"
+                    })
+    return expired
+
+
+def deregistration_delay():
+    attributes = elbv2.describe_target_group_attributes(TargetGroupArn=target_group_arn)['Attributes']
+    for attribute in attributes:
+        if attribute['Key'] == 'deregistration_delay.timeout_seconds':
+            return int(attribute['Value'])
+    return 300
+
+
+def wait_for_draining(instance_ids, context):
+    """Poll target health until none of the instances is draining any more."""
+    deadline = time.monotonic() + deregistration_delay()
+    if context is not None:
+        deadline = min(deadline, time.monotonic() + context.get_remaining_time_in_millis() / 1000 - timeout_margin_seconds)
+
+    targets = [{"Id": instance_id, "Port": dashboard_port} for instance_id in instance_ids]
+    while True:
+        health = elbv2.describe_target_health(TargetGroupArn=target_group_arn, Targets=targets)
+        draining = [
+            t['Target']['Id'] for t in health['TargetHealthDescriptions']
+            if t['TargetHealth']['State'] == 'draining'
+        ]
+        if not draining:
+            return []
+        if time.monotonic() + drain_poll_seconds >= deadline:
+            print(f"Stopped waiting for draining of {draining}")
+            return draining
+        time.sleep(drain_poll_seconds)
+
+
 def lambda_handler(event, context):
+    dry_run = (event or {}).get("dryRun", dry_run_default)
     now = datetime.now(timezone.utc)
 
-    instances = ec2.instances.filter(
-        Filters=[
-            {'Name': 'tag-key', 'Values': ['TerminateAfter']},
-            {'Name': 'instance-state-name', 'Values': ['running']}
-        ]
-    )
-
-    for instance in instances:
-        launch_time = instance.launch_time
-        tags = {tag['Key']: tag['Value'] for tag in instance.tags or []}
-        duration_tag = tags.get("TerminateAfter")
-        duration = parse_duration(duration_tag)
-
-        if duration is None:
-            print(f"Invalid or missing duration on {instance.id}, skipping.")
-            continue
-
-        age = now - launch_time
-        if age >= duration:
-            print(f"Draining instance {instance.id}, age {age}, threshold {duration}")
-            try:
-                # Deregister instance from target group
-                elbv2.deregister_targets(
-                    TargetGroupArn=target_group_arn,
-                    Targets=[{"Id": instance.id, "Port": 11666}]
-                )
-                print(f"Instance {instance.id} deregistered from target group")
-                time.sleep(draining_wait_seconds)
-                print(f"Terminating instance {instance.id}")
-                instance.terminate()
-
-            except Exception as e:
-                print(f"Error terminating {instance.id}: {e}")
\ No newline at end of file
+    expired = find_expired_instances(now)
+    report = {"dryRun": dry_run, "deregistered": [], "terminated": [], "stopped": [], "errors": []}
+    if not expired:
+        print(json.dumps(report))
+        return report
+
+    instance_ids = [i["instanceId"] for i in expired]
+    to_stop = [i["instanceId"] for i in expired if i["warmPool"]]
+    to_terminate = [i["instanceId"] for i in expired if not i["warmPool"]]
+
+    if dry_run:
+        report.update(deregistered=instance_ids, terminated=to_terminate, stopped=to_stop)
+        print(f"Dry run, no changes made: {json.dumps(report)}")
+        return report
+
+    if target_group_arn:
+        try:
+            elbv2.deregister_targets(
+                TargetGroupArn=target_group_arn,
+                Targets=[{"Id": instance_id, "Port": dashboard_port} for instance_id in instance_ids]
+            )
+            report["deregistered"] = instance_ids
+            print(f"Instances {instance_ids} deregistered from target group")
+            wait_for_draining(instance_ids, context)
+        except Exception as e:
+            print(f"Error deregistering {instance_ids}: {e}")
+            report["errors"].append(f"deregister: {e}")
+
+    if to_terminate:
+        try:
+            ec2.terminate_instances(InstanceIds=to_terminate)
+            report["terminated"] = to_terminate
+            print(f"Terminating instances {to_terminate}")
+        except Exception as e:
+            print(f"Error terminating {to_terminate}: {e}")
+            report["errors"].append(f"terminate: {e}")
+
+    if to_stop:
+        try:
+            # Warm-pool instances keep their EBS volume and reports for the next launch
+            ec2.stop_instances(InstanceIds=to_stop)
+            report["stopped"] = to_stop
+            print(f"Stopping warm-pool instances {to_stop}")
+        except Exception as e:
+            print(f"Error stopping {to_stop}: {e}")
+            report["errors"].append(f"stop: {e}")
+
+    print(json.dumps(report))
+    return report
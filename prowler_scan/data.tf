@@ -9,3 +9,4 @@ data "aws_subnets" "public" {
   }
 }
 
+data "aws_caller_identity" "current" {}
@@ -1,13 +1,35 @@
-import csv
-import io
 import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
-import boto3
 from botocore.exceptions import ClientError
 
+from aws_clients import client, table
+from notification_batches import (
+    JOB_ID_PATTERN,
+    batch_key_for,
+    claim_batch,
+    is_complete,
+    job_of_batch,
+    record_result,
+    release_batch,
+    scan_of_family,
+    unsent_batches,
+    update_expected,
+    wait_for_summaries,
+)
+from report_diff import ReportDiff, diff_reports
+from report_parsing import (
+    format_failed_row,
+    read_report,
+    status_is_fail,
+    summary_key_for,
+)
+from task_metrics import emit, task_metrics
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -18,15 +40,42 @@ csv_prefix = os.environ.get("REPORT_CSV_PREFIX", "output/csv/")
 max_checks_in_email = int(os.environ.get("MAX_CHECKS_IN_EMAIL", "20"))
 report_filename_prefix = os.environ.get("REPORT_FILENAME_PREFIX", "prowler-output-")
 report_filename_suffix = os.environ.get("REPORT_FILENAME_SUFFIX", ".csv")
-
-sns = boto3.client("sns")
-s3 = boto3.client("s3")
-
-
-def _normalize_key(key: str | None) -> str:
-    if not key:
-        return ""
-    return re.sub(r"[\s_]", "", key.strip().lower())
+report_index_prefix = os.environ.get("REPORT_INDEX_PREFIX", "index/latest/")
+report_summary_prefix = os.environ.get("REPORT_SUMMARY_PREFIX", "output/summary/")
+report_read_chunk_size = int(os.environ.get("REPORT_READ_CHUNK_SIZE", str(64 * 1024)))
+# Only report findings that are new or resolved since the previous scan of the account.
+notify_only_changes = os.environ.get("NOTIFY_ONLY_CHANGES", "true").lower() == "true"
+notify_unchanged = os.environ.get("NOTIFY_UNCHANGED", "false").lower() == "true"
+# Results of a scan run are buffered in DynamoDB and sent as one digest;
+# AWS_ENDPOINT_URL_DYNAMODB points this at DynamoDB Local.
+batch_table_name = os.environ.get("BATCH_TABLE")
+# Family prefix of each scan's task definitions -> {"scan": name, "tasks": account count}.
+scan_batches = json.loads(os.environ.get("SCAN_BATCHES", "{}"))
+batch_run_window_seconds = int(os.environ.get("BATCH_RUN_WINDOW_SECONDS", "3600"))
+batch_timeout_seconds = int(os.environ.get("BATCH_TIMEOUT_SECONDS", str(6 * 3600)))
+batch_ttl_seconds = int(os.environ.get("BATCH_TTL_SECONDS", str(7 * 24 * 3600)))
+digest_read_concurrency = int(os.environ.get("DIGEST_READ_CONCURRENCY", "10"))
+# SNS rejects messages over 256 KiB; accounts beyond this size are left out of a digest.
+max_digest_bytes = int(os.environ.get("MAX_DIGEST_BYTES", str(240 * 1024)))
+# Scan jobs of the API Lambda; a job records how many accounts of each scan it started.
+job_table_name = os.environ.get("JOB_TABLE")
+# Recent runs per task family, read by the launcher to size auto-sized tasks.
+run_history_prefix = os.environ.get("RUN_HISTORY_PREFIX", "history/runs/")
+run_history_length = int(os.environ.get("RUN_HISTORY_LENGTH", "20"))
+OUT_OF_MEMORY_EXIT_CODE = 137
+FLUSH_BATCHES_ACTION = "flush-batches"
+# Accounts scanned per region group are reported once their parts are merged.
+MERGED_SCAN_DETAIL_TYPE = "Prowler Account Scan Merged"
+PART_FAMILY_PATTERN = re.compile(r"-part(\d+)-(\d+)$")
+FINDINGS_EXIT_CODE = 3
+SUMMARY_PENDING = "summary-pending"
+# Publish errors that a retry of the same message cannot fix.
+PERMANENT_PUBLISH_ERRORS = ("InvalidParameter", "InvalidParameterValue")
+
+sns = client("sns")
+s3 = client("s3")
+batch_table = table(batch_table_name) if batch_table_name else None
+job_table = table(job_table_name) if job_table_name else None
 
 
 def _normalize_prefix(prefix: str) -> str:
@@ -35,34 +84,91 @@ def _normalize_prefix(prefix: str) -> str:
     return prefix if prefix.endswith("/") else prefix + "/"
 
 
-def _find_latest_csv_key(bucket: str, account: str) -> str | None:
+def _parse_time(value: str | None) -> datetime | None:
+    """Parse an ISO 8601 time to whole seconds, the resolution of S3 object times."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(microsecond=0)
+    except ValueError:
+        return None
+
+
+def _read_report_index(bucket: str, account: str, not_before: str | None = None) -> str | None:
+    """Return the latest report key recorded by the report index Lambda.
+
+    The index is updated asynchronously, so an entry written before
+    ``not_before`` (the start of the task being reported) still points at an
+    earlier run and is ignored.
+    """
+    if not account or not report_index_prefix:
+        return None
+
+    index_key = f"{_normalize_prefix(report_index_prefix)}{account}.json"
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=index_key)
+        entry = json.loads(obj["Body"].read())
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+            logger.error(
+                "Unable to read report index %s from bucket %s: %s",
+                index_key,
+                bucket,
+                exc,
+            )
+        return None
+    except ValueError as exc:
+        logger.error("Report index %s is not valid JSON: %s", index_key, exc)
+        return None
+
+    key = entry.get("key") if isinstance(entry, dict) else None
+    indexed_at = _parse_time(entry.get("last_modified")) if key else None
+    started_at = _parse_time(not_before)
+    if key and started_at and (indexed_at is None or indexed_at < started_at):
+        logger.info(
+            "Index entry %s of account %s predates the task started at %s; listing reports",
+            key,
+            account,
+            not_before,
+        )
+        return None
+    if key:
+        logger.info(
+            "Selected report %s (last modified %s) for account %s from index",
+            key,
+            entry.get("last_modified"),
+            account,
+        )
+    return key
+
+
+def _find_latest_csv_key(
+    bucket: str, account: str, use_index: bool = True, not_before: str | None = None
+) -> str | None:
     if not bucket:
         logger.warning("Report bucket not configured; unable to locate CSV reports.")
         return None
 
+    if use_index:
+        indexed_key = _read_report_index(bucket, account, not_before)
+        if indexed_key:
+            return indexed_key
+
     normalized_prefix = _normalize_prefix(csv_prefix)
     prefixes: list[str] = []
 
+    # Narrowest prefix first; every broader prefix is only listed when the
+    # narrower ones found nothing, so skip those that could not add a match.
     if account:
-        prefixes.extend(
-            [
-                f"{normalized_prefix}{report_filename_prefix}{account}",
-                f"{normalized_prefix}{report_filename_prefix}{account}-",
-            ]
-        )
-
-    # Include generic prefixes that contain all report objects
-    prefixes.append(f"{normalized_prefix}{report_filename_prefix}")
-    prefixes.append(normalized_prefix)
+        prefixes.append(f"{normalized_prefix}{report_filename_prefix}{account}-")
+    else:
+        prefixes.append(f"{normalized_prefix}{report_filename_prefix}")
+    prefixes.append(normalized_prefix)  # Reports in nested folders
     if normalized_prefix:
         prefixes.append("")  # Final fallback to bucket root
 
-    seen_prefixes = set()
     latest: dict | None = None
     for prefix in prefixes:
-        if prefix in seen_prefixes:
-            continue
-        seen_prefixes.add(prefix)
         try:
             paginator = s3.get_paginator("list_objects_v2")
             for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
@@ -92,6 +198,14 @@ def _find_latest_csv_key(bucket: str, account: str) -> str | None:
             return None
 
     if latest:
+        started_at = _parse_time(not_before)
+        if started_at and latest["LastModified"] < started_at:
+            logger.warning(
+                "Newest report %s of account %s predates the task started at %s",
+                latest["Key"],
+                account,
+                not_before,
+            )
         logger.info(
             "Selected report %s (last modified %s) for account %s",
             latest["Key"],
@@ -108,191 +222,634 @@ def _find_latest_csv_key(bucket: str, account: str) -> str | None:
     return None
 
 
-def _resolve_delimiter(csv_text: str) -> str:
-    header_line = csv_text.splitlines()[0] if csv_text else ""
-    comma_count = header_line.count(",")
-    semicolon_count = header_line.count(";")
-    if semicolon_count > comma_count:
-        return ";"
-    return ","
-
-
-def _status_is_fail(row: dict) -> bool:
-    for key, value in row.items():
-        if key is None:
-            continue
-        normalized_key = _normalize_key(key)
-        if normalized_key == "status":
-            normalized_value = (value or "").upper()
-            return "FAIL" in normalized_value
-
-    # Fall back to best-effort detection using concatenated values
-    row_values = [v for v in row.values() if isinstance(v, str)]
-    concatenated = " ".join(row_values).upper()
-    if "FAIL" in concatenated:
-        return True
-
-    return False
-
-
-def _format_failed_row(row: dict) -> str:
-    normalized = {}
-    for key, value in row.items():
-        if key is None:
-            continue
-        key_lower = key.strip().lower()
-        norm_key = _normalize_key(key)
-        if norm_key not in normalized or not normalized[norm_key]:
-            normalized[norm_key] = (value or "").strip()
-        if key_lower not in normalized or not normalized[key_lower]:
-            normalized[key_lower] = (value or "").strip()
-
-    check_id = (
-        normalized.get("checkid")
-        or normalized.get("check_id")
-        or normalized.get("controlid")
-        or "Unknown check"
-    )
-    title = normalized.get("checktitle") or normalized.get("check_title") or ""
-    severity = normalized.get("severity") or normalized.get("risk") or ""
-    region = normalized.get("region") or "N/A"
-    resource = (
-        normalized.get("resourceid")
-        or normalized.get("resourceuid")
-        or normalized.get("resource_uid")
-        or normalized.get("resourcearn")
-        or normalized.get("resource_arn")
-        or normalized.get("resourcename")
-        or normalized.get("resource_name")
-        or ""
-    )
-    detail = (
-        normalized.get("statusextended")
-        or normalized.get("status_extended")
-        or normalized.get("statusdetails")
-        or normalized.get("status_detail")
-        or ""
-    )
-    status_column = (
-        normalized.get("status")
-        or normalized.get("statusvalue")
-        or normalized.get("status_field")
-        or ""
-    )
-    status_extended = (
-        normalized.get("status_extended")
-        or normalized.get("status_extendedvalue")
-        or normalized.get("status_ext")
-        or ""
+def _find_previous_csv_key(bucket: str, account: str, latest_key: str) -> str | None:
+    """Return the report of ``account`` written just before ``latest_key``."""
+    prefix = f"{_normalize_prefix(csv_prefix)}{report_filename_prefix}{account}-"
+    reports = []
+    try:
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].lower().endswith(report_filename_suffix.lower()):
+                    reports.append((obj["LastModified"], obj["Key"]))
+    except ClientError as exc:
+        logger.error(
+            "Error listing objects in bucket %s with prefix %s: %s", bucket, prefix, exc
+        )
+        return None
+
+    latest = next((report for report in reports if report[1] == latest_key), None)
+    older = [
+        report
+        for report in reports
+        if report[1] != latest_key and (latest is None or report < latest)
+    ]
+    return max(older)[1] if older else None
+
+
+def _load_report_diff(
+    bucket: str,
+    account: str,
+    limit: int = max_checks_in_email,
+    not_before: str | None = None,
+    report_key: str | None = None,
+) -> tuple[str, str, ReportDiff] | None:
+    """Diff ``report_key`` or the latest report of ``account`` against the previous one.
+
+    Returns None when there is no previous report to compare with, or when a
+    report cannot be read, so the caller can fall back to listing all findings.
+    """
+    key = report_key or _find_latest_csv_key(bucket, account, not_before=not_before)
+    if not key:
+        return None
+    previous_key = _find_previous_csv_key(bucket, account, key)
+    if not previous_key:
+        logger.info("No previous report for account %s; not diffing", account)
+        return None
+
+    def opener(report_key):
+        return lambda: s3.get_object(Bucket=bucket, Key=report_key)["Body"]
+
+    try:
+        diff = diff_reports(
+            opener(previous_key), opener(key), limit, report_read_chunk_size
+        )
+    except ClientError as exc:
+        logger.error(
+            "Unable to diff reports %s and %s in bucket %s: %s",
+            previous_key,
+            key,
+            bucket,
+            exc,
+        )
+        return None
+
+    logger.info(
+        "Diffed %s against %s: %d new, %d resolved, %d failing",
+        key,
+        previous_key,
+        diff.new_count,
+        diff.resolved_count,
+        diff.current_count,
     )
+    return key, previous_key, diff
 
-    headline = f"{check_id}"
-    if severity:
-        headline += f" [{severity}]"
-    if title:
-        headline += f" {title}"
 
-    summary = status_extended or detail or headline
-    if resource and resource not in summary:
-        summary = f"{summary} ({resource})"
+def _read_summary(bucket: str, report_key: str) -> dict | None:
+    """Return the pre-aggregated summary of a report, if it has been written yet."""
+    if not report_summary_prefix:
+        return None
+
+    summary_key = summary_key_for(report_key, report_summary_prefix)
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=summary_key)
+        summary = json.loads(obj["Body"].read())
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+            logger.error("Unable to read summary %s: %s", summary_key, exc)
+        return None
+    except ValueError as exc:
+        logger.error("Summary %s is not valid JSON: %s", summary_key, exc)
+        return None
+
+    logger.info("Using summary %s for report %s", summary_key, report_key)
+    return summary if isinstance(summary, dict) else None
 
-    region_line = f"Region: {region}"
 
-    return f"{summary}\n  {region_line}"
+def _load_failed_checks(
+    bucket: str,
+    account: str,
+    limit: int = max_checks_in_email,
+    not_before: str | None = None,
+    report_key: str | None = None,
+) -> tuple[str | None, list[str], int]:
+    """Collect up to ``limit`` failed checks of ``report_key`` or the latest report.
 
+    Uses the report summary when it exists and streams the CSV otherwise.
 
-def _load_failed_checks(bucket: str, account: str) -> tuple[str | None, list[str]]:
-    key = _find_latest_csv_key(bucket, account)
+    Returns the report key, the formatted examples and the total number of
+    failed rows in the report (which may be larger than the examples list).
+    """
+    key = report_key or _find_latest_csv_key(bucket, account, not_before=not_before)
     if not key:
-        return None, []
+        return None, [], 0
+
+    summary = _read_summary(bucket, key)
+    if summary is not None:
+        return (
+            key,
+            summary.get("failed_examples", [])[:limit],
+            summary.get("totals", {}).get("fail", 0),
+        )
 
     try:
         obj = s3.get_object(Bucket=bucket, Key=key)
+    except s3.exceptions.NoSuchKey:
+        # The indexed report may have expired; fall back to listing the bucket.
+        logger.warning("Report %s no longer exists; listing bucket %s", key, bucket)
+        key = _find_latest_csv_key(bucket, account, use_index=False)
+        if not key:
+            return None, [], 0
+        try:
+            obj = s3.get_object(Bucket=bucket, Key=key)
+        except ClientError as exc:
+            logger.error(
+                "Unable to retrieve report %s from bucket %s: %s", key, bucket, exc
+            )
+            return None, [], 0
     except ClientError as exc:
         logger.error(
             "Unable to retrieve report %s from bucket %s: %s", key, bucket, exc
         )
-        return None, []
+        return None, [], 0
 
-    body_bytes = obj["Body"].read()
+    body = obj["Body"]
     try:
-        csv_text = body_bytes.decode("utf-8-sig")
-    except UnicodeDecodeError:
-        csv_text = body_bytes.decode("utf-8", errors="replace")
+        schema, rows = read_report(body, report_read_chunk_size)
+        failed_checks = []
+        failed_count = 0
+        for row in rows:
+            if status_is_fail(row, schema):
+                failed_count += 1
+                if len(failed_checks) < limit:
+                    failed_checks.append(format_failed_row(row, schema))
+    finally:
+        body.close()
+
+    return key, failed_checks, failed_count
+
+
+def _account_from_task_definition(task_definition_arn: str | None) -> str | None:
+    if task_definition_arn:
+        account_parse = re.search(r"-(\d+):\d+$", task_definition_arn)
+        if account_parse:
+            return account_parse.group(1)
+    return None
 
-    delimiter = _resolve_delimiter(csv_text)
-    reader = csv.DictReader(io.StringIO(csv_text), delimiter=delimiter)
-    failed_checks = []
-    for row in reader:
-        if not row:
-            continue
-        if _status_is_fail(row):
-            failed_checks.append(_format_failed_row(row))
 
-    return key, failed_checks
+def _format_diff(report_key: str, diff: ReportDiff) -> str:
+    def section(title, count, examples):
+        if not count:
+            return f"{title}: none\n"
+        text = f"{title} ({count}):\n" + "\n".join(f"- {item}" for item in examples)
+        if count > len(examples):
+            text += f"\n- ... and {count - len(examples)} more."
+        return text + "\n"
+
+    return (
+        f"Failing findings: {diff.current_count} ({diff.delta:+d} since the previous scan)\n\n"
+        f"{section('New failing findings', diff.new_count, diff.new_examples)}\n"
+        f"{section('Resolved findings', diff.resolved_count, diff.resolved_examples)}\n"
+        f"Full report: s3://{report_bucket}/{report_key}"
+    )
 
 
-def lambda_handler(event, context):
-    logger.info("Received event: %s", json.dumps(event))
+def _describe_findings(
+    account: str | None, not_before: str | None = None, report_key: str | None = None
+) -> str | None:
+    """Describe the findings of ``report_key`` or the latest report of ``account``.
 
-    containers = event.get("detail", {}).get("containers", [])
+    ``not_before`` is the start of the task that wrote the report. Returns
+    None when the findings did not change since the previous scan and
+    unchanged results are not notified.
+    """
+    if not report_bucket:
+        logger.warning("REPORT_BUCKET environment variable not set; skipping report lookup.")
+        return (
+            "This means that the Prowler scan found one or more security checks that have failed that are not whitelisted."
+        )
 
-    for container in containers:
-        exit_code = container.get("exitCode")
-        if exit_code == 3:
-            container_name = container.get("name")
-            task_arn = event.get("detail", {}).get("taskArn")
-            cluster_arn = event.get("detail", {}).get("clusterArn")
-            taskdefinition = event.get("detail", {}).get("taskDefinitionArn")
-            account = None
-            if taskdefinition:
-                account_parse = re.search(r"-(\d+):\d+$", taskdefinition)
-                if account_parse:
-                    account = account_parse.group(1)
-            logger.warning(f"ECS Task exited with code 3: {task_arn} in cluster {cluster_arn}")
-
-            report_key = None
-            failed_checks = []
-            if report_bucket:
-                report_key, failed_checks = _load_failed_checks(report_bucket, account or "")
-            else:
-                logger.warning("REPORT_BUCKET environment variable not set; skipping report lookup.")
-
-            if failed_checks:
-                limited_checks = failed_checks[:max_checks_in_email]
-                remaining = len(failed_checks) - len(limited_checks)
-
-                failed_checks_text = "\n".join(f"- {item}" for item in limited_checks)
-                if remaining > 0:
-                    failed_checks_text += f"\n- ... and {remaining} more checks. See report at s3://{report_bucket}/{report_key}"
-
-                message = (
-                    f"A task named {container_name} scanning account {account or 'unknown'} has finished and found one or more security issues that are not whitelisted.\n\n"
-                    f"Prowler found the following security issues in account {account}:\n\n"
-                    f"{failed_checks_text}\n\n"
-                    f"Please run the Prowler Dashboard for more details.\n"
-                    f"Prowler dashboard: {frontend_url}\n"
-                    f"Failing checks can be muted by adding them to the prowler_mutelist.yaml file."
-                )
-            else:
-                additional_note = ""
-                if report_key:
-                    additional_note = f" Report located at s3://{report_bucket}/{report_key}, but no failed checks were detected within the file."
-                elif report_bucket:
-                    additional_note = " No report file could be located for this task; please verify the ECS logs and S3 bucket manually."
-
-                message = (
-                    f"A task named {container_name} that was scanning account {account or 'unknown'} has finished with exit code 3.\n"
-                    f"This means that the Prowler scan found one or more security checks that have failed that are not whitelisted.{additional_note}\n"
-                    f"Please run the Prowler Dashboard for more details."
-                    f"Prowler dashboard: {frontend_url}"
+    if notify_only_changes and account:
+        report_diff = _load_report_diff(report_bucket, account, not_before=not_before, report_key=report_key)
+        if report_diff is not None:
+            report_key, previous_key, diff = report_diff
+            if not diff.changed and not notify_unchanged:
+                logger.info(
+                    "No new or resolved findings in %s since %s; not notifying",
+                    report_key,
+                    previous_key,
                 )
+                return None
+            return _format_diff(report_key, diff)
 
-            sns.publish(
-                TopicArn=topic_arn,
-                Subject=f"Prowler has found security issues in account {account}",
-                Message=message
+    return _describe_failed_checks(account, not_before, report_key)
+
+
+def _describe_failed_checks(
+    account: str | None, not_before: str | None = None, report_key: str | None = None
+) -> str:
+    """Describe all failed checks of ``report_key`` or the latest report of ``account``."""
+    report_key, failed_checks, failed_count = _load_failed_checks(
+        report_bucket, account or "", not_before=not_before, report_key=report_key
+    )
+    if failed_checks:
+        remaining = failed_count - len(failed_checks)
+        failed_checks_text = "\n".join(f"- {item}" for item in failed_checks)
+        if remaining > 0:
+            failed_checks_text += f"\n- ... and {remaining} more checks. See report at s3://{report_bucket}/{report_key}"
+        return f"Prowler found the following security issues in account {account}:\n\n{failed_checks_text}"
+
+    if report_key:
+        note = f"Report located at s3://{report_bucket}/{report_key}, but no failed checks were detected within the file."
+    else:
+        note = "No report file could be located for this task; please verify the ECS logs and S3 bucket manually."
+    return (
+        f"The task finished with exit code 3, which means that the Prowler scan found one or more security checks "
+        f"that have failed that are not whitelisted. {note}"
+    )
+
+
+FOOTER = (
+    "Please run the Prowler Dashboard for more details.\n"
+    "Prowler dashboard: {frontend_url}\n"
+    "Failing checks can be muted by adding them to the prowler_mutelist.yaml file."
+)
+
+
+def _notify_task(
+    container_name: str, account: str | None, not_before: str | None = None, report_key: str | None = None
+) -> bool:
+    """Send the notification of a single task with findings."""
+    findings = _describe_findings(account, not_before, report_key)
+    if findings is None:
+        return False
+
+    message = (
+        f"A task named {container_name} scanning account {account or 'unknown'} has finished and found one or more security issues that are not whitelisted.\n\n"
+        f"{findings}\n\n"
+        f"{FOOTER.format(frontend_url=frontend_url)}"
+    )
+    sns.publish(
+        TopicArn=topic_arn,
+        Subject=f"Prowler has found security issues in account {account}",
+        Message=message
+    )
+    return True
+
+
+def _task_result(detail: dict) -> dict:
+    exit_codes = [
+        c.get("exitCode") for c in detail.get("containers", []) if c.get("exitCode") is not None
+    ]
+    exit_code = FINDINGS_EXIT_CODE if FINDINGS_EXIT_CODE in exit_codes else next(iter(exit_codes), None)
+    return {
+        "exit_code": exit_code,
+        "task_arn": detail.get("taskArn"),
+        "stopped_reason": detail.get("stoppedReason"),
+        "started_at": detail.get("startedAt"),
+    }
+
+
+def _describe_batched_account(account: str, result: dict, wait_for_summary: bool) -> str | None:
+    """Describe the findings of ``account`` for a digest, like a single-task notification.
+
+    New and resolved findings come from the diff of the last two reports. The
+    report summary is only needed without an earlier report to diff against;
+    it is written asynchronously by the report summary Lambda, so while it is
+    missing and ``wait_for_summary`` is set, SUMMARY_PENDING is returned and
+    the digest is retried by the next flush.
+    """
+    not_before, report_key = result.get("started_at"), result.get("report_key")
+    if not report_bucket or not notify_only_changes:
+        return _describe_findings(account, not_before, report_key)
+    report_diff = _load_report_diff(report_bucket, account, not_before=not_before, report_key=report_key)
+    if report_diff is not None:
+        report_key, previous_key, diff = report_diff
+        if not diff.changed and not notify_unchanged:
+            logger.info("No new or resolved findings in %s since %s", report_key, previous_key)
+            return None
+        return _format_diff(report_key, diff)
+
+    report_key = report_key or _find_latest_csv_key(report_bucket, account, not_before=not_before)
+    if wait_for_summary and report_key and _read_summary(report_bucket, report_key) is None:
+        logger.info("Summary of report %s is not written yet", report_key)
+        return SUMMARY_PENDING
+    return _describe_failed_checks(account, not_before, report_key)
+
+
+def _fit_digest(summary: str, findings: list[str], failed: list[str], footer: str) -> str:
+    """Join the digest sections, leaving out the accounts that do not fit in max_digest_bytes."""
+    def size(text):
+        return len(text.encode("utf-8")) + 2
+
+    # Room for the note about left out accounts.
+    budget = max_digest_bytes - size(summary) - size(footer) - 512
+    sections = [summary]
+    shown = 0
+    for section in findings:
+        if size(section) > budget:
+            break
+        budget -= size(section)
+        sections.append(section)
+        shown += 1
+    omitted = len(findings) - shown
+
+    failed_lines = []
+    if failed:
+        budget -= size("Tasks that did not complete:")
+        for line in failed:
+            if len(line.encode("utf-8")) + 1 > budget:
+                break
+            budget -= len(line.encode("utf-8")) + 1
+            failed_lines.append(line)
+        omitted += len(failed) - len(failed_lines)
+    if failed_lines:
+        sections.append("Tasks that did not complete:\n" + "\n".join(failed_lines))
+    if omitted:
+        sections.append(
+            f"... {omitted} more accounts are not listed to keep this message within the SNS size limit. "
+            f"See the dashboard at {frontend_url} or the reports in s3://{report_bucket}/{_normalize_prefix(csv_prefix)}."
+        )
+    sections.append(footer)
+    return "\n\n".join(sections)
+
+
+def _send_digest(batch_key: str) -> bool:
+    """Send one notification covering every account of a batch, at most once.
+
+    The message is built before the batch is claimed, so a digest whose
+    invocation times out while reading reports is sent by the next flush.
+    """
+    batch = batch_table.get_item(Key={"batch_key": batch_key}, ConsistentRead=True).get("Item")
+    if batch is None or "sent_at" in batch:
+        logger.info("Digest for batch %s was already sent", batch_key)
+        return False
+
+    scan_name = batch_key.split("#", 1)[0]
+    results = batch.get("results", {})
+    expected = int(batch.get("expected", 0))
+    failed = []
+    clean = 0
+    with_findings = []
+    for account, result in sorted(results.items()):
+        exit_code = result.get("exit_code")
+        exit_code = int(exit_code) if exit_code is not None else None
+        if exit_code == 0:
+            clean += 1
+        elif exit_code == FINDINGS_EXIT_CODE:
+            with_findings.append(account)
+        else:
+            reason = result.get("stopped_reason") or "unknown reason"
+            failed.append(f"- {account}: exit code {exit_code} ({reason})")
+
+    # Wait for missing report summaries once; the next attempt streams the reports.
+    wait_for_summary = "summary_wait_at" not in batch
+    with ThreadPoolExecutor(max_workers=max(1, min(digest_read_concurrency, len(with_findings) or 1))) as executor:
+        descriptions = list(executor.map(
+            lambda account: _describe_batched_account(account, results[account], wait_for_summary),
+            with_findings,
+        ))
+    if SUMMARY_PENDING in descriptions:
+        logger.info("Report summaries of batch %s are not written yet; retrying on the next flush", batch_key)
+        wait_for_summaries(batch_table, batch_key)
+        return False
+    findings = [
+        f"=== Account {account} ===\n{description}"
+        for account, description in zip(with_findings, descriptions)
+        if description is not None
+    ]
+
+    if not findings and not failed:
+        logger.info("Nothing to notify for batch %s", batch_key)
+        claim_batch(batch_table, batch_key)
+        return False
+
+    summary = f"Prowler scan {scan_name} finished for {len(results)} of {expected} accounts."
+    if len(results) < expected:
+        summary += f" The remaining accounts did not report within {batch_timeout_seconds // 60} minutes."
+    summary += (
+        f"\nAccounts with findings to report: {len(findings)}, without findings: {clean}, "
+        f"with failed tasks: {len(failed)}."
+    )
+    message = _fit_digest(summary, findings, failed, FOOTER.format(frontend_url=frontend_url))
+
+    if claim_batch(batch_table, batch_key) is None:
+        logger.info("Digest for batch %s was sent by another invocation", batch_key)
+        return False
+    try:
+        sns.publish(
+            TopicArn=topic_arn,
+            # SNS subjects are limited to 100 characters.
+            Subject=f"Prowler scan {scan_name}: issues in {len(findings) + len(failed)} accounts"[:100],
+            Message=message
+        )
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in PERMANENT_PUBLISH_ERRORS:
+            # Releasing the batch would only fail the same way on every flush.
+            logger.error("Digest for batch %s was rejected and is not retried: %s", batch_key, exc)
+            return False
+        release_batch(batch_table, batch_key)
+        raise
+    logger.info("Sent digest for batch %s", batch_key)
+    return True
+
+
+def _family_of(task_definition_arn: str | None) -> str:
+    return (task_definition_arn or "").rsplit("/", 1)[-1].rpartition(":")[0]
+
+
+def _merged_scan_result(detail: dict) -> dict:
+    missing = detail.get("missingRegionGroups") or []
+    return {
+        "exit_code": detail.get("exitCode"),
+        "task_arn": detail.get("scanId"),
+        "stopped_reason": f"region groups {missing} did not report" if missing else None,
+        # The merged report is announced right after its upload, before the
+        # report index and summary Lambdas have caught up.
+        "report_key": detail.get("reportKey"),
+        "started_at": detail.get("createdAt"),
+    }
+
+
+def _job_expected_reports(job_id: str, prefix: str) -> int | None:
+    """Accounts of a scan that a job started, or None when the job does not say."""
+    if job_table is None:
+        return None
+    try:
+        job = job_table.get_item(Key={"job_id": job_id, "sk": "job"}, ConsistentRead=True).get("Item")
+    except ClientError as exc:
+        logger.error("Unable to read scan job %s: %s", job_id, exc)
+        return None
+    expected = (job or {}).get("expected_reports", {}).get(prefix)
+    return int(expected) if expected is not None else None
+
+
+def _expected_reports(detail: dict, prefix: str, settings: dict) -> int:
+    """Accounts the scan run reports on: those its job started, or every account of the scan."""
+    started_by = detail.get("startedBy") or ""
+    if JOB_ID_PATTERN.match(started_by):
+        expected = _job_expected_reports(started_by, prefix)
+        if expected is not None:
+            return expected
+    return int(settings["tasks"])
+
+
+def _record_batched_result(detail: dict, account: str, prefix: str, settings: dict, result: dict) -> bool:
+    """Buffer the result of an account scan; returns False when it cannot be batched."""
+    batch_key = batch_key_for(detail, settings["scan"], batch_run_window_seconds)
+    if batch_key is None:
+        return False
+
+    batch = record_result(
+        batch_table,
+        batch_key,
+        account,
+        result,
+        _expected_reports(detail, prefix, settings),
+        batch_ttl_seconds,
+    )
+    logger.info(
+        "Recorded account %s in batch %s (%d of %s)",
+        account,
+        batch_key,
+        len(batch.get("results", {})),
+        batch.get("expected"),
+    )
+    if is_complete(batch):
+        _send_digest(batch_key)
+    return True
+
+
+def _complete_job_batch(batch_key: str) -> bool:
+    """Send the digest of a job batch whose missing accounts failed to start after its last result."""
+    scan_name = batch_key.rpartition("#job-")[0]
+    prefix = next((prefix for prefix, settings in scan_batches.items() if settings["scan"] == scan_name), None)
+    expected = _job_expected_reports(job_of_batch(batch_key), prefix) if prefix else None
+    if expected is None:
+        return False
+    batch = update_expected(batch_table, batch_key, expected)
+    return batch is not None and is_complete(batch) and _send_digest(batch_key)
+
+
+def _flush_timed_out_batches() -> dict:
+    keys, waiting_jobs = unsent_batches(batch_table, batch_timeout_seconds)
+    sent = [key for key in keys if _send_digest(key)]
+    sent += [key for key in waiting_jobs if _complete_job_batch(key)]
+    logger.info("Flushed %d timed out or waiting batches, sent %d digests", len(keys), len(sent))
+    return {"flushed": keys, "sent": sent}
+
+
+def _emit_task_metrics(detail: dict, family: str) -> None:
+    """Publish timing and cost metrics of a stopped task; never blocks notifications."""
+    try:
+        part = PART_FAMILY_PATTERN.search(family)
+        # Region group tasks belong to the scan of their account family.
+        account_family = PART_FAMILY_PATTERN.sub(r"-\2", family)
+        scan = scan_of_family(account_family, scan_batches)
+        metrics = task_metrics(detail)
+        if metrics:
+            emit(
+                metrics,
+                {"Scan": scan[1]["scan"] if scan else "unknown"},
+                Account=_account_from_task_definition(detail.get("taskDefinitionArn")),
+                RegionGroup=int(part.group(1)) if part else None,
+                TaskArn=detail.get("taskArn"),
+                Cpu=detail.get("cpu"),
+                Memory=detail.get("memory"),
+            )
+    except Exception:
+        logger.exception("Unable to publish task metrics")
+
+
+def _is_out_of_memory(detail: dict) -> bool:
+    reasons = [detail.get("stoppedReason") or ""]
+    reasons += [c.get("reason") or "" for c in detail.get("containers", [])]
+    return any("OutOfMemory" in reason for reason in reasons) or any(
+        c.get("exitCode") == OUT_OF_MEMORY_EXIT_CODE for c in detail.get("containers", [])
+    )
+
+
+def _record_run_history(detail: dict, family: str) -> None:
+    """Append the size and outcome of a stopped task to the history of its family."""
+    if not report_bucket or not run_history_prefix or not family:
+        return
+    try:
+        metrics = task_metrics(detail)
+        run = {
+            "stopped_at": detail.get("stoppedAt"),
+            "runtime_seconds": metrics.get("RuntimeSeconds", (None,))[0],
+            "cpu": detail.get("cpu"),
+            "memory": detail.get("memory"),
+            "exit_code": metrics.get("ExitCode", (None,))[0],
+            "out_of_memory": _is_out_of_memory(detail),
+        }
+        key = f"{_normalize_prefix(run_history_prefix)}{family}.json"
+        try:
+            history = json.loads(s3.get_object(Bucket=report_bucket, Key=key)["Body"].read())
+        except s3.exceptions.NoSuchKey:
+            history = []
+        history = (history + [run])[-run_history_length:]
+        s3.put_object(
+            Bucket=report_bucket,
+            Key=key,
+            Body=json.dumps(history).encode("utf-8"),
+            ContentType="application/json",
+        )
+    except Exception:
+        logger.exception("Unable to record run history of %s", family)
+
+
+def _handle_merged_scan(detail: dict) -> dict:
+    """Notify about an account scanned per region group, once its report is merged."""
+    account = detail.get("account")
+    scan = next(
+        ((prefix, settings) for prefix, settings in scan_batches.items() if settings["scan"] == detail.get("scanName")),
+        None,
+    )
+    if batch_table is not None and account and scan is not None:
+        _record_batched_result(detail, account, *scan, _merged_scan_result(detail))
+    elif detail.get("exitCode") == FINDINGS_EXIT_CODE:
+        _notify_task(
+            f"{detail.get('scanName')} (merged region scans)", account, detail.get("createdAt"), detail.get("reportKey")
+        )
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps("Checked merged account scan.")
+    }
+
+
+def lambda_handler(event, context):
+    logger.info("Received event: %s", json.dumps(event))
+
+    if event.get("action") == FLUSH_BATCHES_ACTION:
+        if batch_table is None:
+            return {"flushed": [], "sent": []}
+        return _flush_timed_out_batches()
+
+    detail = event.get("detail", {})
+    if event.get("detail-type") == MERGED_SCAN_DETAIL_TYPE:
+        return _handle_merged_scan(detail)
+
+    family = _family_of(detail.get("taskDefinitionArn"))
+    _emit_task_metrics(detail, family)
+    _record_run_history(detail, family)
+    if PART_FAMILY_PATTERN.search(family):
+        return {
+            "statusCode": 200,
+            "body": json.dumps("Region group task; reported after its account scan is merged.")
+        }
+
+    account = _account_from_task_definition(detail.get("taskDefinitionArn"))
+    scan = scan_of_family(family, scan_batches)
+    if (
+        batch_table is not None
+        and account
+        and scan is not None
+        and _record_batched_result(detail, account, *scan, _task_result(detail))
+    ):
+        return {
+            "statusCode": 200,
+            "body": json.dumps("Recorded ECS task result for the scan digest.")
+        }
+
+    for container in detail.get("containers", []):
+        exit_code = container.get("exitCode")
+        if exit_code == FINDINGS_EXIT_CODE:
+            logger.warning(
+                f"ECS Task exited with code 3: {detail.get('taskArn')} in cluster {detail.get('clusterArn')}"
             )
+            _notify_task(container.get("name"), account, detail.get("startedAt"))
             break
 
     return {
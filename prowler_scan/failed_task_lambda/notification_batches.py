@@ -0,0 +1,168 @@
+"""Aggregation of scan task results into one notification per scan run.
+
+Every stopped task records its exit code in the batch of its scan run. A batch
+is keyed by the scan name and the run: the scan job id for scans started from
+the API, or the creation time of the task floored to the run window for
+scheduled scans (all tasks of a schedule are created within seconds).
+"""
+
+import re
+import time
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+
+# Job ids are created by the API Lambda with uuid4().hex.
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def scan_of_family(family: str, scan_batches: dict) -> tuple[str, dict] | None:
+    """Return (prefix, batch settings) of the scan a task definition family belongs to."""
+    for prefix, settings in scan_batches.items():
+        if family.startswith(prefix) and family[len(prefix):].isdigit():
+            return prefix, settings
+    return None
+
+
+def batch_key_for(detail: dict, scan_name: str, run_window_seconds: int) -> str | None:
+    started_by = detail.get("startedBy") or ""
+    if JOB_ID_PATTERN.match(started_by):
+        return f"{scan_name}#job-{started_by}"
+
+    created_at = detail.get("createdAt")
+    if not created_at:
+        return None
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+    run = int(created // run_window_seconds * run_window_seconds)
+    return f"{scan_name}#run-{run}"
+
+
+def _is_conditional_failure(exc: ClientError) -> bool:
+    return exc.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def record_result(
+    table, batch_key: str, account: str, result: dict, expected: int, ttl_seconds: int
+) -> dict:
+    """Store the result of one account and return the updated batch.
+
+    ``expected`` replaces the stored count, which drops when accounts of a job
+    fail to start.
+    """
+    now = int(time.time())
+    try:
+        return table.update_item(
+            Key={"batch_key": batch_key},
+            UpdateExpression="SET results.#account = :result, expected = :expected",
+            ConditionExpression="attribute_exists(batch_key)",
+            ExpressionAttributeNames={"#account": account},
+            ExpressionAttributeValues={":result": result, ":expected": expected},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]
+    except ClientError as exc:
+        if not _is_conditional_failure(exc):
+            raise
+
+    item = {
+        "batch_key": batch_key,
+        "expected": expected,
+        "results": {account: result},
+        "created_at": now,
+        "expires_at": now + ttl_seconds,
+    }
+    try:
+        table.put_item(Item=item, ConditionExpression="attribute_not_exists(batch_key)")
+        return item
+    except ClientError as exc:
+        if not _is_conditional_failure(exc):
+            raise
+    # Another invocation created the batch in the meantime.
+    return record_result(table, batch_key, account, result, expected, ttl_seconds)
+
+
+def job_of_batch(batch_key: str) -> str | None:
+    """The scan job id of a batch of a scan started from the API."""
+    _, _, job_id = batch_key.rpartition("#job-")
+    return job_id if JOB_ID_PATTERN.match(job_id) else None
+
+
+def update_expected(table, batch_key: str, expected: int) -> dict | None:
+    """Lower the expected count of an unsent batch; returns the batch when it changed."""
+    try:
+        return table.update_item(
+            Key={"batch_key": batch_key},
+            UpdateExpression="SET expected = :expected",
+            ConditionExpression="attribute_exists(batch_key) AND attribute_not_exists(sent_at) AND expected > :expected",
+            ExpressionAttributeValues={":expected": expected},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return None
+        raise
+
+
+def is_complete(batch: dict) -> bool:
+    return len(batch.get("results", {})) >= int(batch.get("expected", 0))
+
+
+def claim_batch(table, batch_key: str) -> dict | None:
+    """Mark a batch as sent; only the invocation that wins the claim sends the digest.
+
+    Claim right before publishing: a claimed batch is never flushed again.
+    """
+    try:
+        return table.update_item(
+            Key={"batch_key": batch_key},
+            UpdateExpression="SET sent_at = :now",
+            ConditionExpression="attribute_exists(batch_key) AND attribute_not_exists(sent_at)",
+            ExpressionAttributeValues={":now": int(time.time())},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return None
+        raise
+
+
+def release_batch(table, batch_key: str) -> None:
+    """Undo a claim whose digest could not be published, so a later flush retries it."""
+    table.update_item(Key={"batch_key": batch_key}, UpdateExpression="REMOVE sent_at")
+
+
+def wait_for_summaries(table, batch_key: str) -> None:
+    """Leave a batch unsent until the next flush, because report summaries are missing."""
+    try:
+        table.update_item(
+            Key={"batch_key": batch_key},
+            UpdateExpression="SET summary_wait_at = :now",
+            ConditionExpression="attribute_exists(batch_key) AND attribute_not_exists(sent_at)",
+            ExpressionAttributeValues={":now": int(time.time())},
+        )
+    except ClientError as exc:
+        if not _is_conditional_failure(exc):
+            raise
+
+
+def unsent_batches(table, timeout_seconds: int) -> tuple[list[str], list[str]]:
+    """Return the keys of unsent batches to send now and of unsent job batches that may be complete.
+
+    A batch is sent when its first result is older than the timeout, or when
+    it waited for report summaries.
+    """
+    cutoff = int(time.time()) - timeout_seconds
+    due, waiting_jobs = [], []
+    kwargs = {
+        "FilterExpression": "attribute_not_exists(sent_at)",
+        "ProjectionExpression": "batch_key, created_at, summary_wait_at",
+    }
+    while True:
+        page = table.scan(**kwargs)
+        for item in page.get("Items", []):
+            if int(item["created_at"]) <= cutoff or "summary_wait_at" in item:
+                due.append(item["batch_key"])
+            elif job_of_batch(item["batch_key"]):
+                waiting_jobs.append(item["batch_key"])
+        if "LastEvaluatedKey" not in page:
+            return due, waiting_jobs
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
@@ -0,0 +1,104 @@
+"""Scan-to-scan diff of the FAIL findings of two Prowler CSV reports.
+
+A finding is identified by its check id, resource and region. Keys are stored
+as fixed-size digests, so memory grows with the number of distinct findings
+and not with the size of the rows.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable
+
+from report_parsing import (
+    DEFAULT_CHUNK_SIZE,
+    first_value,
+    format_failed_row,
+    read_report,
+    status_is_fail,
+)
+
+FINDING_KEY_DIGEST_SIZE = 16
+
+
+def finding_key(row: list[str], schema) -> bytes:
+    """Stable key of a finding: check id + resource + region."""
+    parts = (
+        first_value(row, schema.check_id),
+        first_value(row, schema.resource),
+        first_value(row, schema.region),
+    )
+    return hashlib.blake2b(
+        "\x1f".join(parts).encode("utf-8"), digest_size=FINDING_KEY_DIGEST_SIZE
+    ).digest()
+
+
+def _iter_failed(body, chunk_size: int):
+    """Yield (key, row, schema) for every FAIL row of a report and close it."""
+    try:
+        schema, rows = read_report(body, chunk_size)
+        if schema is None:
+            return
+        for row in rows:
+            if status_is_fail(row, schema):
+                yield finding_key(row, schema), row, schema
+    finally:
+        body.close()
+
+
+@dataclass
+class ReportDiff:
+    previous_count: int = 0
+    current_count: int = 0
+    new_count: int = 0
+    resolved_count: int = 0
+    new_examples: list[str] = field(default_factory=list)
+    resolved_examples: list[str] = field(default_factory=list)
+
+    @property
+    def delta(self) -> int:
+        return self.current_count - self.previous_count
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.new_count or self.resolved_count)
+
+
+def diff_reports(
+    open_previous: Callable[[], object],
+    open_current: Callable[[], object],
+    limit: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ReportDiff:
+    """Compare the distinct FAIL findings of two reports.
+
+    ``open_previous`` and ``open_current`` return a fresh streaming body of
+    the report each time they are called. The previous report is streamed a
+    second time only when findings were resolved, to format up to ``limit``
+    of them.
+    """
+    previous = {key for key, _, _ in _iter_failed(open_previous(), chunk_size)}
+
+    diff = ReportDiff(previous_count=len(previous))
+    current: set[bytes] = set()
+    for key, row, schema in _iter_failed(open_current(), chunk_size):
+        if key in current:
+            continue
+        current.add(key)
+        if key not in previous:
+            diff.new_count += 1
+            if len(diff.new_examples) < limit:
+                diff.new_examples.append(format_failed_row(row, schema))
+    diff.current_count = len(current)
+
+    resolved = previous - current
+    del previous
+    diff.resolved_count = len(resolved)
+    if resolved and limit > 0:
+        for key, row, schema in _iter_failed(open_previous(), chunk_size):
+            if key in resolved:
+                resolved.discard(key)
+                diff.resolved_examples.append(format_failed_row(row, schema))
+                if len(diff.resolved_examples) >= limit or not resolved:
+                    break
+
+    return diff
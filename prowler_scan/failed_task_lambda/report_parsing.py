@@ -0,0 +1,161 @@
+"""Streaming parser for Prowler CSV reports, shared by the notifier and the
+report summary Lambda (both are deployed from this directory)."""
+
+import codecs
+import csv
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Iterator
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def normalize_key(key: str | None) -> str:
+    if not key:
+        return ""
+    return re.sub(r"[\s_]", "", key.strip().lower())
+
+
+def resolve_delimiter(header_line: str) -> str:
+    comma_count = header_line.count(",")
+    semicolon_count = header_line.count(";")
+    if semicolon_count > comma_count:
+        return ";"
+    return ","
+
+
+def iter_report_lines(body, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Decode a StreamingBody incrementally and yield lines with their endings.
+
+    Only one chunk plus one partial line is held in memory at a time, so the
+    footprint stays flat regardless of the report size.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    for chunk in body.iter_chunks(chunk_size=chunk_size):
+        # The last element may be an incomplete line; keep it for the next chunk.
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+# Candidate header names per field, in order of preference, after normalize_key.
+COLUMN_CANDIDATES = {
+    "check_id": ("checkid", "controlid"),
+    "title": ("checktitle",),
+    "severity": ("severity", "risk"),
+    "region": ("region",),
+    "service": ("servicename", "service"),
+    "resource": ("resourceid", "resourceuid", "resourcearn", "resourcename"),
+    "status": ("status", "statusvalue", "statusfield"),
+    "status_extended": (
+        "statusextended",
+        "statusextendedvalue",
+        "statusext",
+        "statusdetails",
+        "statusdetail",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ReportSchema:
+    """Column indexes of the fields we care about, resolved once per report."""
+
+    check_id: tuple[int, ...]
+    title: tuple[int, ...]
+    severity: tuple[int, ...]
+    region: tuple[int, ...]
+    service: tuple[int, ...]
+    resource: tuple[int, ...]
+    status: tuple[int, ...]
+    status_extended: tuple[int, ...]
+
+    @classmethod
+    def from_header(cls, header: list[str]) -> "ReportSchema":
+        positions: dict[str, list[int]] = {}
+        for index, name in enumerate(header):
+            positions.setdefault(normalize_key(name), []).append(index)
+        return cls(
+            **{
+                field: tuple(
+                    index
+                    for candidate in candidates
+                    for index in positions.get(candidate, ())
+                )
+                for field, candidates in COLUMN_CANDIDATES.items()
+            }
+        )
+
+
+def first_value(row: list[str], indexes: tuple[int, ...]) -> str:
+    for index in indexes:
+        if index < len(row):
+            value = row[index].strip()
+            if value:
+                return value
+    return ""
+
+
+def status_is_fail(row: list[str], schema: ReportSchema) -> bool:
+    if schema.status:
+        status_index = schema.status[0]
+        return status_index < len(row) and "FAIL" in row[status_index].upper()
+
+    # Fall back to best-effort detection when the report has no status column
+    return any("FAIL" in value.upper() for value in row)
+
+
+def format_failed_row(row: list[str], schema: ReportSchema) -> str:
+    check_id = first_value(row, schema.check_id) or "Unknown check"
+    title = first_value(row, schema.title)
+    severity = first_value(row, schema.severity)
+    region = first_value(row, schema.region) or "N/A"
+    resource = first_value(row, schema.resource)
+    status_extended = first_value(row, schema.status_extended)
+
+    headline = f"{check_id}"
+    if severity:
+        headline += f" [{severity}]"
+    if title:
+        headline += f" {title}"
+
+    summary = status_extended or headline
+    if resource and resource not in summary:
+        summary = f"{summary} ({resource})"
+
+    region_line = f"Region: {region}"
+
+    return f"{summary}\n  {region_line}"
+
+
+def read_report(
+    body, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> tuple[ReportSchema | None, Iterator[list[str]]]:
+    """Return the report schema and an iterator over its non-empty data rows.
+
+    The schema is None for an empty report.
+    """
+    lines = iter_report_lines(body, chunk_size)
+    header_line = next(lines, "")
+    if not header_line:
+        return None, iter(())
+
+    reader = csv.reader(
+        itertools.chain([header_line], lines),
+        delimiter=resolve_delimiter(header_line),
+    )
+    schema = ReportSchema.from_header(next(reader, []))
+    return schema, (row for row in reader if row)
+
+
+def summary_key_for(report_key: str, summary_prefix: str) -> str:
+    """Key of the JSON summary written for the CSV report ``report_key``."""
+    filename = report_key.rsplit("/", 1)[-1]
+    stem = filename.rsplit(".", 1)[0]
+    prefix = summary_prefix if summary_prefix.endswith("/") else summary_prefix + "/"
+    return f"{prefix}{stem}.json"
@@ -0,0 +1,176 @@
+import io
+import json
+import logging
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+
+from aws_clients import client
+from report_parsing import (
+    first_value,
+    format_failed_row,
+    read_report,
+    status_is_fail,
+    summary_key_for,
+)
+from task_metrics import emit
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+summary_prefix = os.environ.get("REPORT_SUMMARY_PREFIX", "output/summary/")
+report_filename_prefix = os.environ.get("REPORT_FILENAME_PREFIX", "prowler-output-")
+report_filename_suffix = os.environ.get("REPORT_FILENAME_SUFFIX", ".csv")
+top_resources = int(os.environ.get("SUMMARY_TOP_RESOURCES", "25"))
+max_examples = int(os.environ.get("SUMMARY_MAX_EXAMPLES", "50"))
+write_parquet = os.environ.get("SUMMARY_PARQUET", "false").lower() == "true"
+
+# pyarrow takes a while to import; skip it on cold starts unless Parquet is enabled.
+pyarrow = None
+if write_parquet:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # pyarrow is only available through a Lambda layer
+        pass
+
+s3 = client("s3")
+
+account_pattern = re.compile(rf"^{re.escape(report_filename_prefix)}(\d+)-")
+
+
+def build_summary(schema, rows, report_key: str) -> dict:
+    """Aggregate a report into counts per status, and FAIL counts per dimension."""
+    by_status = Counter()
+    by_severity = Counter()
+    by_check = Counter()
+    by_region = Counter()
+    by_service = Counter()
+    by_resource = Counter()
+    examples = []
+
+    for row in rows:
+        if not status_is_fail(row, schema):
+            by_status[first_value(row, schema.status).upper() or "UNKNOWN"] += 1
+            continue
+        by_status["FAIL"] += 1
+        by_severity[first_value(row, schema.severity).lower() or "unknown"] += 1
+        by_check[first_value(row, schema.check_id) or "unknown"] += 1
+        by_region[first_value(row, schema.region) or "unknown"] += 1
+        by_service[first_value(row, schema.service) or "unknown"] += 1
+        resource = first_value(row, schema.resource)
+        if resource:
+            by_resource[resource] += 1
+        if len(examples) < max_examples:
+            examples.append(format_failed_row(row, schema))
+
+    match = account_pattern.match(report_key.rsplit("/", 1)[-1])
+    return {
+        "account": match.group(1) if match else None,
+        "report_key": report_key,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "totals": {
+            "rows": sum(by_status.values()),
+            "fail": by_status["FAIL"],
+            "by_status": dict(by_status),
+        },
+        "fail_by_severity": dict(by_severity),
+        "fail_by_check": dict(by_check),
+        "fail_by_region": dict(by_region),
+        "fail_by_service": dict(by_service),
+        "top_failing_resources": [
+            {"resource": resource, "count": count}
+            for resource, count in by_resource.most_common(top_resources)
+        ],
+        "failed_examples": examples,
+    }
+
+
+def _summary_parquet(summary: dict) -> bytes:
+    """Flatten the FAIL counts into one (dimension, value, fail_count) table."""
+    dimensions, values, counts = [], [], []
+    for dimension in ("severity", "check", "region", "service"):
+        for value, count in summary[f"fail_by_{dimension}"].items():
+            dimensions.append(dimension)
+            values.append(value)
+            counts.append(count)
+    for item in summary["top_failing_resources"]:
+        dimensions.append("resource")
+        values.append(item["resource"])
+        counts.append(item["count"])
+
+    table = pyarrow.table(
+        {"dimension": dimensions, "value": values, "fail_count": counts}
+    )
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def write_summary(bucket: str, report_key: str) -> str:
+    obj = s3.get_object(Bucket=bucket, Key=report_key)
+    body = obj["Body"]
+    try:
+        schema, rows = read_report(body)
+        if schema is None:
+            rows = iter(())
+        summary = build_summary(schema, rows, report_key)
+    finally:
+        body.close()
+
+    summary_key = summary_key_for(report_key, summary_prefix)
+    s3.put_object(
+        Bucket=bucket,
+        Key=summary_key,
+        Body=json.dumps(summary).encode("utf-8"),
+        ContentType="application/json",
+    )
+    logger.info(
+        "Wrote summary %s (%d failed of %d rows)",
+        summary_key,
+        summary["totals"]["fail"],
+        summary["totals"]["rows"],
+    )
+    emit(
+        {
+            "ReportBytes": (obj.get("ContentLength"), "Bytes"),
+            "FindingsCount": (summary["totals"]["fail"], "Count"),
+        },
+        {},
+        Account=summary["account"],
+        ReportKey=report_key,
+    )
+
+    if write_parquet:
+        if pyarrow is None:
+            logger.warning("SUMMARY_PARQUET is set but pyarrow is not available.")
+        else:
+            s3.put_object(
+                Bucket=bucket,
+                Key=summary_key.rsplit(".", 1)[0] + ".parquet",
+                Body=_summary_parquet(summary),
+            )
+    return summary_key
+
+
+def lambda_handler(event, context):
+    logger.info("Received event: %s", json.dumps(event))
+
+    detail = event.get("detail", {})
+    bucket = detail.get("bucket", {}).get("name")
+    key = detail.get("object", {}).get("key")
+    if not bucket or not key:
+        return {"statusCode": 400, "body": json.dumps("Missing bucket or object key.")}
+    if not key.lower().endswith(report_filename_suffix.lower()):
+        return {"statusCode": 200, "body": json.dumps("Not a CSV report; skipped.")}
+    if not key.rsplit("/", 1)[-1].startswith(report_filename_prefix):
+        # Region group parts are summarized once merged into the account report.
+        return {"statusCode": 200, "body": json.dumps("Not an account report; skipped.")}
+
+    summary_key = write_summary(bucket, key)
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"summary": summary_key})
+    }
@@ -0,0 +1,81 @@
+"""CloudWatch Embedded Metric Format (EMF) records for scan tasks and reports.
+
+Records are printed to stdout, where CloudWatch Logs extracts the metrics.
+Metrics are at most dimensioned by scan, so the number of custom metrics does
+not grow with the number of accounts. The account is kept as a log property that
+the scan-durations endpoint queries with Logs Insights.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "Prowler")
+# Fargate Linux/x86 on-demand prices; override them for the deployment region.
+fargate_vcpu_hour_price = float(os.environ.get("FARGATE_VCPU_HOUR_PRICE", "0.04048"))
+fargate_gb_hour_price = float(os.environ.get("FARGATE_GB_HOUR_PRICE", "0.004445"))
+
+
+def _seconds_between(start: str | None, end: str | None) -> float | None:
+    if not start or not end:
+        return None
+    delta = datetime.fromisoformat(end.replace("Z", "+00:00")) - datetime.fromisoformat(
+        start.replace("Z", "+00:00")
+    )
+    return round(delta.total_seconds(), 3)
+
+
+def fargate_cost(cpu_units: str | int | None, memory_mb: str | int | None, seconds: float | None) -> float | None:
+    """Estimated on-demand cost of a Fargate task; billing has a one-minute minimum."""
+    if cpu_units is None or memory_mb is None or seconds is None:
+        return None
+    hours = max(seconds, 60) / 3600
+    vcpu = int(cpu_units) / 1024
+    memory_gb = int(memory_mb) / 1024
+    return round(hours * (vcpu * fargate_vcpu_hour_price + memory_gb * fargate_gb_hour_price), 6)
+
+
+def task_metrics(detail: dict) -> dict:
+    """Timing and cost of a stopped task from its ECS Task State Change event.
+
+    Queue wait is the time from creation until the image pull started, which
+    covers capacity provisioning. Start latency runs from creation until the
+    container started, runtime from start until the task stopped.
+    """
+    runtime = _seconds_between(detail.get("startedAt"), detail.get("stoppedAt"))
+    exit_codes = [
+        c.get("exitCode") for c in detail.get("containers", []) if c.get("exitCode") is not None
+    ]
+    metrics = {
+        "QueueWaitSeconds": (_seconds_between(detail.get("createdAt"), detail.get("pullStartedAt")), "Seconds"),
+        "StartLatencySeconds": (_seconds_between(detail.get("createdAt"), detail.get("startedAt")), "Seconds"),
+        "RuntimeSeconds": (runtime, "Seconds"),
+        "ExitCode": (max(exit_codes) if exit_codes else None, "None"),
+        "EstimatedCost": (fargate_cost(detail.get("cpu"), detail.get("memory"), runtime), "None"),
+    }
+    return {name: value for name, value in metrics.items() if value[0] is not None}
+
+
+def emit(metrics: dict, dimensions: dict, **properties) -> dict:
+    """Print one EMF record with ``metrics`` ({name: (value, unit)}).
+
+    ``dimensions`` may be empty to publish the metrics without dimensions.
+    """
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()],
+                }
+            ],
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()},
+        **{name: value for name, value in properties.items() if value is not None},
+    }
+    print(json.dumps(record))
+    return record
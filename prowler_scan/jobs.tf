@@ -0,0 +1,112 @@
+resource "aws_dynamodb_table" "scan_jobs" {
+  name         = "prowler_scan_jobs"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "job_id"
+  range_key    = "sk"
+
+  attribute {
+    name = "job_id"
+    type = "S"
+  }
+
+  # "job" for the job counters, "task#<arn>", "queue#<position>" and
+  # "failure#<task definition>" for the items of its tasks.
+  attribute {
+    name = "sk"
+    type = "S"
+  }
+
+  # Only job items with queued tasks have queue_state, so this index lists
+  # the jobs waiting for a free slot, oldest first.
+  attribute {
+    name = "queue_state"
+    type = "S"
+  }
+
+  attribute {
+    name = "created_at"
+    type = "N"
+  }
+
+  global_secondary_index {
+    name            = "queued_jobs"
+    hash_key        = "queue_state"
+    range_key       = "created_at"
+    projection_type = "KEYS_ONLY"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
+
+resource "aws_cloudwatch_event_rule" "task_state_change" {
+  name        = "prowler-task-state-change"
+  description = "Track state changes of Prowler scan tasks"
+  event_pattern = jsonencode({
+    source      = ["aws.ecs"],
+    detail-type = ["ECS Task State Change"],
+    detail = {
+      clusterArn = [aws_ecs_cluster.prowler_ecs_cluster.arn]
+    }
+  })
+}
+
+resource "aws_cloudwatch_event_target" "task_state_change" {
+  rule      = aws_cloudwatch_event_rule.task_state_change.name
+  target_id = "RecordScanJobState"
+  arn       = module.lambda_prowler.lambda_function_arn
+}
+
+resource "aws_lambda_permission" "task_state_change" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_prowler.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.task_state_change.arn
+}
+
+# Queued tasks normally start when a scan task stops; the sweep covers stop
+# events that found the drain lease taken.
+resource "aws_cloudwatch_event_rule" "drain_scan_queues" {
+  count               = var.scan_concurrency > 0 ? 1 : 0
+  name                = "prowler-drain-scan-queues"
+  description         = "Start queued scan tasks while the cluster has free slots"
+  schedule_expression = "rate(5 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "drain_scan_queues" {
+  count     = var.scan_concurrency > 0 ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.drain_scan_queues[0].name
+  target_id = "DrainScanQueues"
+  arn       = module.lambda_prowler.lambda_function_arn
+  input     = jsonencode({ action = "drain-queues" })
+}
+
+resource "aws_lambda_permission" "drain_scan_queues" {
+  count         = var.scan_concurrency > 0 ? 1 : 0
+  statement_id  = "AllowQueueDrainFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_prowler.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.drain_scan_queues[0].arn
+}
+
+data "aws_iam_policy_document" "lambda_scan_jobs" {
+  statement {
+    sid = "ReadWriteScanJobs"
+
+    actions = [
+      "dynamodb:GetItem",
+      "dynamodb:PutItem",
+      "dynamodb:UpdateItem",
+      "dynamodb:DeleteItem",
+      "dynamodb:ConditionCheckItem",
+      "dynamodb:BatchWriteItem",
+      "dynamodb:Query"
+    ]
+
+    resources = [aws_dynamodb_table.scan_jobs.arn, "${aws_dynamodb_table.scan_jobs.arn}/index/*"]
+  }
+}
@@ -0,0 +1,19 @@
+# Python modules shared by the Lambdas, kept once under shared/ and shipped as a
+# layer; Lambda puts the layer's python/ directory on sys.path.
+data "archive_file" "shared_layer" {
+  type             = "zip"
+  output_path      = "${path.root}/.terraform-build/prowler_shared_layer.zip"
+  output_file_mode = "0666"
+
+  source {
+    content  = file("${path.module}/shared/aws_clients.py")
+    filename = "python/aws_clients.py"
+  }
+}
+
+resource "aws_lambda_layer_version" "shared" {
+  layer_name          = "prowler_shared"
+  filename            = data.archive_file.shared_layer.output_path
+  source_code_hash    = data.archive_file.shared_layer.output_base64sha256
+  compatible_runtimes = ["python3.13"]
+}
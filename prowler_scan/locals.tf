@@ -15,10 +15,31 @@ locals {
     }
   ]) : "${value.prowler_scan}" => value }
 
+  # Number of region group tasks per account of the scans that split accounts by region.
+  scan_region_groups = {
+    for scan_name, scan in var.prowler_scans : "${scan.task_definition_name}-${scan_name}-" => {
+      scan = scan_name
+      groups = length(scan.region_groups) > 0 ? length(scan.region_groups) : (
+        scan.parallel_regions ? length(compact(scan.prowler_scan_regions)) : 0
+      )
+    }
+  }
+
+  report_csv_prefix     = "output/csv/"
+  report_index_prefix   = "index/latest/"
+  report_summary_prefix = "output/summary/"
+  run_history_prefix    = "history/runs/"
+
+  # Log groups with the EMF task and report metrics queried by the scan-durations endpoint.
+  metrics_log_groups = [
+    "/aws/lambda/${module.lambda_prowler_failed_task.lambda_function_name}",
+    "/aws/lambda/${module.lambda_report_summary.lambda_function_name}"
+  ]
+
   rest_api_id = aws_api_gateway_rest_api.prowler.id
   parent_id   = aws_api_gateway_rest_api.prowler.root_resource_id
 
-  cors_headers = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token'"
+  cors_headers = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,If-None-Match'"
   cors_origin  = "'*'"
 
   endpoints = {
@@ -37,6 +58,14 @@ locals {
     "check-dashboard-status" = {
       http_method     = "GET",
       allowed_methods = "'GET,OPTIONS'"
+    },
+    "findings-summary" = {
+      http_method     = "GET",
+      allowed_methods = "'GET,OPTIONS'"
+    },
+    "scan-durations" = {
+      http_method     = "GET",
+      allowed_methods = "'GET,OPTIONS'"
     }
   }
 }
\ No newline at end of file
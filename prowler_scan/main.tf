@@ -13,6 +13,9 @@ module "prowler" {
   prowler_account_list         = each.value.prowler_account_list
   compliance_checks            = each.value.compliance_checks
   severity                     = each.value.severity
+  parallel_regions             = each.value.parallel_regions
+  region_groups                = each.value.region_groups
+  account_sizes                = each.value.account_sizes
 
   ecs_cluster_name             = var.ecs_cluster_name
   container_name               = var.container_name
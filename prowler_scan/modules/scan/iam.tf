@@ -16,7 +16,7 @@ resource "aws_iam_role_policy" "allow_assumerole" {
   })
 }
 resource "aws_iam_role_policy" "allow_runtask_schedule" {
-  for_each = toset(var.prowler_account_list)
+  for_each = local.tasks
   name     = "prowler_schedule_runtask_policy_${var.scan_name}_${each.key}"
   role     = var.schedule_role_id
 
@@ -3,4 +3,30 @@ locals {
   compliance_args = length(compact(var.compliance_checks)) == 0 ? [] : concat(["--compliance"], compact(var.compliance_checks))
   severity_args   = length(compact(var.severity)) == 0 ? [] : concat(["--severity"], compact(var.severity))
   command_args    = concat(local.region_args, local.compliance_args, local.severity_args)
-}
\ No newline at end of file
+
+  # Explicit region groups win; parallel_regions puts every region in its own group.
+  region_groups = length(var.region_groups) > 0 ? var.region_groups : (
+    var.parallel_regions ? [for region in compact(var.prowler_scan_regions) : [region]] : []
+  )
+
+  # One task per account, or one task per account and region group. Region
+  # group tasks write a fixed part filename that the report merge Lambda
+  # combines into the usual per-account report.
+  tasks = length(local.region_groups) == 0 ? {
+    for account in var.prowler_account_list : account => {
+      account       = account
+      family_suffix = account
+      command_args  = local.command_args
+    }
+    } : {
+    for pair in setproduct(var.prowler_account_list, range(length(local.region_groups))) : "${pair[0]}-part${pair[1]}" => {
+      account       = pair[0]
+      family_suffix = "part${pair[1]}-${pair[0]}"
+      command_args = concat(
+        ["-f"], local.region_groups[pair[1]],
+        local.compliance_args, local.severity_args,
+        ["-F", "prowler-part-${pair[0]}-${pair[1]}"]
+      )
+    }
+  }
+}
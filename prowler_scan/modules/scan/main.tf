@@ -1,12 +1,12 @@
 resource "aws_ecs_task_definition" "prowler_ecs_task_definition" {
-  for_each                 = toset(var.prowler_account_list)
-  family                   = "${var.task_definition_name}-${var.scan_name}-${each.value}"
+  for_each                 = local.tasks
+  family                   = "${var.task_definition_name}-${var.scan_name}-${each.value.family_suffix}"
   execution_role_arn       = var.execution_role_arn
   task_role_arn            = var.task_role_arn
   requires_compatibilities = ["FARGATE"]
   network_mode             = "awsvpc"
-  cpu                      = var.fargate_task_cpu
-  memory                   = var.fargate_memory
+  cpu                      = try(var.account_sizes[each.value.account].cpu, var.fargate_task_cpu)
+  memory                   = try(var.account_sizes[each.value.account].memory, var.fargate_memory)
 
   container_definitions = jsonencode(
     [
@@ -14,14 +14,14 @@ resource "aws_ecs_task_definition" "prowler_ecs_task_definition" {
         command = concat([
           "aws",
           "-R",
-          "arn:aws:iam::${each.value}:role/${var.prowler_rolename_in_accounts}",
+          "arn:aws:iam::${each.value.account}:role/${var.prowler_rolename_in_accounts}",
           "-M",
           "${var.prowler_report_output_format}",
           "-D",
           "${var.prowler_bucket_id}",
           "-w",
           "s3://${var.prowler_bucket_id}/mutelist/mutelist.yaml"],
-        local.command_args)
+        each.value.command_args)
 
 
         essential = true
@@ -46,8 +46,8 @@ resource "aws_ecs_task_definition" "prowler_ecs_task_definition" {
 
 
 resource "aws_scheduler_schedule" "prowler" {
-  for_each   = toset(var.prowler_account_list)
-  name       = "${var.container_name}-${var.scan_name}-${each.value}"
+  for_each   = local.tasks
+  name       = "${var.container_name}-${var.scan_name}-${each.key}"
   group_name = "default"
 
   flexible_time_window {
@@ -115,6 +115,27 @@ variable "severity" {
   default = []
 }
 
+variable "parallel_regions" {
+  type        = bool
+  default     = false
+  description = "Scan every region of an account in its own task and merge the results"
+}
+
+variable "region_groups" {
+  type        = list(list(string))
+  default     = []
+  description = "Groups of regions that are scanned in their own task and merged per account; overrides parallel_regions"
+}
+
+variable "account_sizes" {
+  type = map(object({
+    cpu    = string
+    memory = string
+  }))
+  default     = {}
+  description = "Fargate CPU and memory per account ID, overriding fargate_task_cpu and fargate_memory"
+}
+
 variable "scan_name" {
   type = string
 }
\ No newline at end of file
@@ -26,6 +26,7 @@ module "lambda_prowler_failed_task" {
   memory_size = 128
   timeout     = 600
   runtime     = "python3.13"
+  layers      = [aws_lambda_layer_version.shared.arn]
 
   source_type               = "local"
   source_directory_location = "${path.module}/failed_task_lambda/"
@@ -36,6 +37,18 @@ module "lambda_prowler_failed_task" {
     FRONTEND_URL = var.dashboard_frontend_url
     REPORT_BUCKET = var.prowler_report_bucket_name
     REPORT_FILENAME_PREFIX = "prowler-output-"
+    REPORT_CSV_PREFIX      = local.report_csv_prefix
+    REPORT_INDEX_PREFIX    = local.report_index_prefix
+    REPORT_SUMMARY_PREFIX  = local.report_summary_prefix
+    NOTIFY_ONLY_CHANGES    = var.notify_only_changes
+    RUN_HISTORY_PREFIX     = local.run_history_prefix
+    BATCH_TABLE            = var.notification_batching ? aws_dynamodb_table.notification_batches.name : ""
+    BATCH_TIMEOUT_SECONDS  = var.notification_batch_timeout
+    JOB_TABLE              = aws_dynamodb_table.scan_jobs.name
+    SCAN_BATCHES = jsonencode({ for scan_name, scan in var.prowler_scans : "${scan.task_definition_name}-${scan_name}-" => {
+      scan  = scan_name
+      tasks = length(scan.prowler_account_list)
+    } })
   }
 
   sqs_dlq_arn = var.dlq_arn
@@ -63,6 +76,7 @@ module "iam_role_lambda_prowler_failed_task" {
 
   customer_managed_policies = {
     "publish_failed_task" : jsondecode(data.aws_iam_policy_document.publish_failed_task.json)
+    "notification_batches" : jsondecode(data.aws_iam_policy_document.notification_batches.json)
   }
 
   trust_relationship = {
@@ -89,6 +103,16 @@ data "aws_iam_policy_document" "publish_failed_task" {
     ]
   }
 
+  statement {
+    sid = "WriteRunHistory"
+    actions = [
+      "s3:PutObject"
+    ]
+    resources = [
+      "arn:aws:s3:::${var.prowler_report_bucket_name}/${local.run_history_prefix}*"
+    ]
+  }
+
   statement {
     sid = "ReadReportObjects"
     actions = [
@@ -0,0 +1,61 @@
+resource "aws_dynamodb_table" "notification_batches" {
+  name         = "prowler_notification_batches"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "batch_key"
+
+  attribute {
+    name = "batch_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
+
+resource "aws_cloudwatch_event_rule" "flush_notification_batches" {
+  name                = "prowler-flush-notification-batches"
+  description         = "Send scan digests of batches that timed out waiting for tasks"
+  schedule_expression = "rate(15 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "flush_notification_batches" {
+  rule      = aws_cloudwatch_event_rule.flush_notification_batches.name
+  target_id = "FlushNotificationBatches"
+  arn       = module.lambda_prowler_failed_task.lambda_function_arn
+  input     = jsonencode({ action = "flush-batches" })
+}
+
+resource "aws_lambda_permission" "flush_notification_batches" {
+  statement_id  = "AllowBatchFlushFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_prowler_failed_task.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.flush_notification_batches.arn
+}
+
+data "aws_iam_policy_document" "notification_batches" {
+  statement {
+    sid = "ReadWriteNotificationBatches"
+
+    actions = [
+      "dynamodb:GetItem",
+      "dynamodb:PutItem",
+      "dynamodb:UpdateItem",
+      "dynamodb:Scan"
+    ]
+
+    resources = [aws_dynamodb_table.notification_batches.arn]
+  }
+
+  statement {
+    sid = "ReadScanJobs"
+
+    actions = [
+      "dynamodb:GetItem"
+    ]
+
+    resources = [aws_dynamodb_table.scan_jobs.arn]
+  }
+}
@@ -11,6 +11,7 @@ module "lambda_prowler" {
   memory_size = 128
   timeout     = 600
   runtime     = "python3.13"
+  layers      = [aws_lambda_layer_version.shared.arn]
 
   source_type               = "local"
   source_directory_location = "${path.module}/prowler_lambda/"
@@ -23,6 +24,22 @@ module "lambda_prowler" {
     DASHBOARD_UPTIME          = var.dashboard_uptime
     DASHBOARD_TG_ARN          = aws_lb_target_group.dashboard.arn
     DASHBOARD_ALB_DNS         = aws_lb.dashboard.dns_name
+    DASHBOARD_WARM_POOL       = var.dashboard_warm_pool
+    RUN_TASK_CONCURRENCY      = var.run_task_concurrency
+    SCAN_CONCURRENCY          = var.scan_concurrency
+    # Enough connections for the thread pools that fan out RunTask, DescribeTasks and summary reads.
+    AWS_MAX_POOL_CONNECTIONS  = max(25, var.run_task_concurrency)
+    CRITICAL_ACCOUNTS         = jsonencode(var.critical_accounts)
+    JOB_TABLE                 = aws_dynamodb_table.scan_jobs.name
+    REPORT_BUCKET             = aws_s3_bucket.prowler_bucket.id
+    REPORT_SUMMARY_PREFIX     = local.report_summary_prefix
+    METRICS_LOG_GROUPS        = jsonencode(local.metrics_log_groups)
+    RUN_HISTORY_PREFIX        = local.run_history_prefix
+    AUTO_SIZING_MAX_CPU       = var.auto_sizing_max_cpu
+    AUTO_SIZING_FAMILY_PREFIXES = jsonencode([
+      for scan_name, scan in var.prowler_scans : "${scan.task_definition_name}-${scan_name}-" if scan.auto_sizing
+    ])
+    TASK_FAMILY_PREFIXES      = jsonencode([for scan_name, scan in var.prowler_scans : "${scan.task_definition_name}-${scan_name}-"])
   }
 
   sqs_dlq_arn = var.dlq_arn
@@ -39,6 +56,10 @@ module "iam_role_lambda_prowler" {
     "lambda_list_tasks" : jsondecode(data.aws_iam_policy_document.lambda_list_tasks.json)
     "lambda_pass_role" : jsondecode(data.aws_iam_policy_document.lambda_pass_role.json)
     "lambda_launch_dashboard" : jsondecode(data.aws_iam_policy_document.launch_dashboard.json)
+    "lambda_invoke_self" : jsondecode(data.aws_iam_policy_document.lambda_invoke_self.json)
+    "lambda_scan_jobs" : jsondecode(data.aws_iam_policy_document.lambda_scan_jobs.json)
+    "lambda_read_summaries" : jsondecode(data.aws_iam_policy_document.lambda_read_summaries.json)
+    "lambda_query_metrics" : jsondecode(data.aws_iam_policy_document.lambda_query_metrics.json)
   }
 
   trust_relationship = {
@@ -51,6 +72,7 @@ data "aws_iam_policy_document" "launch_dashboard" {
     sid = "EC2LaunchFromTemplate"
     actions = [
       "ec2:RunInstances",
+      "ec2:StartInstances",
       "ec2:DescribeInstances",
       "ec2:DescribeLaunchTemplates",
       "ec2:DescribeLaunchTemplateVersions",
@@ -95,6 +117,58 @@ data "aws_iam_policy_document" "lambda_list_tasks" {
   }
 }
 
+data "aws_iam_policy_document" "lambda_invoke_self" {
+  statement {
+    sid = "AllowAsyncRunTaskHandOff"
+
+    actions = ["lambda:InvokeFunction"]
+
+    # Built from the name to avoid a dependency cycle between the role and the function.
+    resources = ["arn:aws:lambda:${var.region}:${data.aws_caller_identity.current.account_id}:function:*prowler_task_execution_lamdba*"]
+  }
+}
+
+data "aws_iam_policy_document" "lambda_read_summaries" {
+  statement {
+    sid     = "ListSummaries"
+    actions = ["s3:ListBucket"]
+    resources = [
+      aws_s3_bucket.prowler_bucket.arn
+    ]
+    condition {
+      test     = "StringLike"
+      variable = "s3:prefix"
+      values   = ["${local.report_summary_prefix}*", "${local.run_history_prefix}*"]
+    }
+  }
+
+  statement {
+    sid     = "ReadSummaries"
+    actions = ["s3:GetObject"]
+    resources = [
+      "${aws_s3_bucket.prowler_bucket.arn}/${local.report_summary_prefix}*",
+      "${aws_s3_bucket.prowler_bucket.arn}/${local.run_history_prefix}*"
+    ]
+  }
+}
+
+data "aws_iam_policy_document" "lambda_query_metrics" {
+  statement {
+    sid     = "QueryTaskMetrics"
+    actions = ["logs:StartQuery"]
+    resources = [
+      for log_group in local.metrics_log_groups :
+      "arn:aws:logs:${var.region}:${data.aws_caller_identity.current.account_id}:log-group:${log_group}:*"
+    ]
+  }
+
+  statement {
+    sid       = "ReadQueryResults"
+    actions   = ["logs:GetQueryResults", "logs:StopQuery"]
+    resources = ["*"]
+  }
+}
+
 data "aws_iam_policy_document" "lambda_pass_role" {
   statement {
     sid = "AllowLambdaListTasks"
@@ -1,11 +1,27 @@
-import boto3
+import base64
+import hashlib
 import os
 import json
+import random
+import re
 import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
-ecs_client = boto3.client('ecs')
-ec2_client = boto3.client('ec2')
-elbv2_client = boto3.client('elbv2')
+from aws_clients import client, table
+
+ecs_client = client('ecs')
+# RunTask throttling is retried by run_task_with_retry within the request
+# deadline; botocore retries on top of that would multiply the attempts.
+run_task_ecs_client = client('ecs', Config(retries={"total_max_attempts": 1, "mode": "standard"}))
+ec2_client = client('ec2')
+elbv2_client = client('elbv2')
+lambda_client = client('lambda')
+s3_client = client('s3')
+logs_client = client('logs')
 
 ecs_cluster = os.environ["CLUSTER"]
 ecs_subnet = os.environ["SUBNET"]
@@ -13,9 +29,142 @@ dashboard_template = os.environ['DASHBOARD_LAUNCH_TEMPLATE']
 dashboard_uptime = os.environ["DASHBOARD_UPTIME"]
 dashboard_tg_arn = os.environ['DASHBOARD_TG_ARN']
 dashboard_alb_dns = os.environ['DASHBOARD_ALB_DNS']
+# Warm-pool instances are stopped instead of terminated and restarted on the next launch.
+dashboard_warm_pool = os.environ.get("DASHBOARD_WARM_POOL", "false").lower() == "true"
+run_task_concurrency = int(os.environ.get("RUN_TASK_CONCURRENCY", "10"))
+run_task_max_attempts = int(os.environ.get("RUN_TASK_MAX_ATTEMPTS", "5"))
+# API Gateway cuts the integration off after 29 seconds; keep a safety margin.
+# The budget starts when the request arrives and covers every AWS call of it.
+start_task_budget_seconds = float(os.environ.get("START_TASK_BUDGET_SECONDS", "20"))
+# Summary reads that order the accounts get at most this share of the budget;
+# accounts whose summaries are not read by then are ordered by last scan only.
+scan_priority_budget_seconds = float(os.environ.get("SCAN_PRIORITY_BUDGET_SECONDS", "5"))
+# Maximum number of scan tasks running on the cluster at once; 0 means no limit.
+# Tasks over the limit are queued in the job and started when any scan task
+# stops, when a start fails, or by the scheduled sweep, oldest job first.
+scan_concurrency = int(os.environ.get("SCAN_CONCURRENCY", "0"))
+# Accounts that are always scanned first.
+critical_accounts = set(json.loads(os.environ.get("CRITICAL_ACCOUNTS", "[]")))
+JOB_UPDATE_ATTEMPTS = 5
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ServerException",
+}
+RUN_TASKS_ACTION = "run-tasks"
+DRAIN_QUEUES_ACTION = "drain-queues"
+
+# Family prefixes of the Prowler task definitions, "<task_definition_name>-<scan_name>-".
+task_family_prefixes = json.loads(os.environ.get("TASK_FAMILY_PREFIXES", "[]"))
+task_definition_cache_ttl = float(os.environ.get("TASK_DEFINITION_CACHE_TTL", "300"))
+_task_definition_cache = {"arns": None, "expires": 0.0}
+
+# Task families of scans with auto_sizing, sized from the run history in the report bucket.
+auto_sizing_family_prefixes = json.loads(os.environ.get("AUTO_SIZING_FAMILY_PREFIXES", "[]"))
+run_history_prefix = os.environ.get("RUN_HISTORY_PREFIX", "history/runs/")
+auto_sizing_runs = int(os.environ.get("AUTO_SIZING_RUNS", "5"))
+auto_sizing_slow_seconds = float(os.environ.get("AUTO_SIZING_SLOW_SECONDS", str(2 * 3600)))
+auto_sizing_fast_seconds = float(os.environ.get("AUTO_SIZING_FAST_SECONDS", str(15 * 60)))
+FARGATE_MIN_CPU = 256
+# CPU units -> (minimum MiB, maximum MiB, MiB increment) of valid Fargate memory sizes.
+FARGATE_MEMORY_RANGES = {
+    256: (512, 2048, 512),
+    512: (1024, 4096, 1024),
+    1024: (2048, 8192, 1024),
+    2048: (4096, 16384, 1024),
+    4096: (8192, 30720, 1024),
+    8192: (16384, 61440, 4096),
+    16384: (32768, 122880, 8192),
+}
+# The largest Fargate CPU size at or under AUTO_SIZING_MAX_CPU.
+auto_sizing_max_cpu = max(
+    (cpu for cpu in FARGATE_MEMORY_RANGES if cpu <= int(os.environ.get("AUTO_SIZING_MAX_CPU", "4096"))),
+    default=FARGATE_MIN_CPU,
+)
+
+# Scan jobs are tracked in DynamoDB; AWS_ENDPOINT_URL_DYNAMODB points this at DynamoDB Local.
+job_table_name = os.environ.get("JOB_TABLE")
+job_ttl_seconds = int(os.environ.get("JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+job_table = table(job_table_name) if job_table_name else None
+# A job is a "job" item with counters, plus one item per task, queued task
+# definition and start failure under the same job_id, so no item grows with
+# the number of accounts and a status poll reads a single small item.
+JOB_ITEM = "job"
+TASK_ITEM_PREFIX = "task#"
+QUEUE_ITEM_PREFIX = "queue#"
+FAILURE_ITEM_PREFIX = "failure#"
+# Job ids are uuid4().hex; tasks started by schedules carry other startedBy values.
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+JOB_COUNTERS = ("queued", "pending", "running", "succeeded", "failed", "findings")
+# Job items with queued tasks carry queue_state, indexed by the sparse queued_jobs index.
+QUEUED_JOBS_INDEX = "queued_jobs"
+QUEUE_STATE_QUEUED = "queued"
+# One invocation at a time starts queued tasks, so free slots are not filled twice.
+DRAIN_LEASE_KEY = {"job_id": "queue-drain", "sk": "lease"}
+drain_lease_seconds = int(os.environ.get("DRAIN_LEASE_SECONDS", "120"))
+
+# describe_tasks accepts at most 100 ARNs per call.
+DESCRIBE_TASKS_CHUNK_SIZE = 100
+describe_tasks_concurrency = int(os.environ.get("DESCRIBE_TASKS_CONCURRENCY", "5"))
+stopped_task_cache_size = int(os.environ.get("STOPPED_TASK_CACHE_SIZE", "5000"))
+# Tasks never leave STOPPED, so their status can be reused across polls.
+_stopped_task_cache = {}
+
+# Findings summaries are the per-report JSON files written by the report summary Lambda.
+report_bucket = os.environ.get("REPORT_BUCKET")
+report_summary_prefix = os.environ.get("REPORT_SUMMARY_PREFIX", "output/summary/")
+report_filename_prefix = os.environ.get("REPORT_FILENAME_PREFIX", "prowler-output-")
+findings_summary_cache_ttl = float(os.environ.get("FINDINGS_SUMMARY_CACHE_TTL", "60"))
+findings_summary_default_scans = int(os.environ.get("FINDINGS_SUMMARY_DEFAULT_SCANS", "5"))
+FINDINGS_SUMMARY_MAX_SCANS = 50
+FINDINGS_SUMMARY_TOP_CHECKS = 10
+summary_read_concurrency = int(os.environ.get("SUMMARY_READ_CONCURRENCY", "10"))
+summary_account_pattern = re.compile(rf"^{re.escape(report_filename_prefix)}(\d+)-")
+_summary_listing_cache = {"objects": None, "expires": 0.0}
+# Summaries are keyed by S3 key and ETag, so a rewritten summary is fetched again.
+_summary_cache = {}
+summary_cache_size = int(os.environ.get("SUMMARY_CACHE_SIZE", "2000"))
+
+# Log groups holding the EMF task and report metrics of the notifier and summary Lambdas.
+metrics_log_groups = json.loads(os.environ.get("METRICS_LOG_GROUPS", "[]"))
+scan_durations_cache_ttl = float(os.environ.get("SCAN_DURATIONS_CACHE_TTL", "300"))
+SCAN_DURATIONS_MAX_DAYS = 30
+SCAN_DURATIONS_MAX_LIMIT = 100
+# Logs Insights queries have to finish within the API Gateway timeout.
+SCAN_DURATIONS_QUERY_BUDGET_SECONDS = 20
+_scan_durations_cache = {}
+
+# Status routes polled by the frontend. Responses asking the client to poll
+# again are shared by all browser tabs served by this container for this long.
+status_cache_ttl = float(os.environ.get("STATUS_CACHE_TTL", "3"))
+STATUS_CACHE_SIZE = 500
+_status_cache = {}
+# Retry-After hints in seconds; scans run for minutes, dashboards boot in about one.
+TASK_STATUS_RETRY_AFTER = {"starting": 10, "running": 30}
+DASHBOARD_STATUS_RETRY_AFTER = {"starting": 10, "initializing": 5, "pending": 5, "unhealthy": 15, "stopping": 10}
+# A warm-pool instance still stopping is waited for this long before the launch
+# is answered with 503 and Retry-After, within the API Gateway timeout.
+WARM_INSTANCE_STOP_WAIT_SECONDS = 15
+WARM_INSTANCE_POLL_SECONDS = 2
+
+DASHBOARD_INSTANCE_NAME = "dashboard-instance"
+
+PENDING_STATUSES = {"PROVISIONING", "PENDING", "ACTIVATING"}
+FINDINGS_EXIT_CODE = 3
 
 
 def lambda_handler(event, context):
+    if event.get("action") == RUN_TASKS_ACTION:
+        return run_tasks_async(event)
+    if event.get("action") == DRAIN_QUEUES_ACTION:
+        return {"started": drain_queues()}
+    if event.get("source") == "aws.ecs":
+        return handle_task_state_change(event)
+    if event.get("source") == "aws.ec2":
+        return handle_instance_state_change(event)
+
     method = event.get("requestContext", {}).get("http", {}).get("method", event.get("httpMethod", "GET"))
     path = event.get("rawPath") or event.get("path", "")
     print(f"Incoming request: {method} {path}")
@@ -25,14 +174,22 @@ def lambda_handler(event, context):
 
     try:
         if method == "POST" and path.endswith("/start-task"):
-            return start_task()
+            return start_task(event, context)
         elif method == "GET" and path.endswith("/check-task-status"):
-            task_arn = event.get("queryStringParameters", {}).get("taskArn")
-            return check_task_status(task_arn)
+            params = event.get("queryStringParameters") or {}
+            if params.get("jobId"):
+                return conditional_status(event, ("job", params["jobId"]), lambda: check_job_status(params["jobId"]))
+            return conditional_status(
+                event, ("tasks", params.get("taskArn")), lambda: check_task_status(params.get("taskArn"))
+            )
+        elif method == "GET" and path.endswith("/findings-summary"):
+            return findings_summary_handler(event.get("queryStringParameters") or {})
+        elif method == "GET" and path.endswith("/scan-durations"):
+            return scan_durations_handler(event.get("queryStringParameters") or {})
         elif method == "POST" and path.endswith("/launch-dashboard"):
             return launch_dashboard_handler()
         elif method == "GET" and path.endswith("/check-dashboard-status"):
-            return check_dashboard_status_handler(event)
+            return conditional_status(event, ("dashboard",), lambda: check_dashboard_status_handler(event))
         else:
             return respond(404, {"error": "Unknown route"})
     except Exception as e:
@@ -40,32 +197,205 @@ def lambda_handler(event, context):
         return respond(500, {"error": str(e)})
 
 
-def respond(status_code, body_dict):
+def respond(status_code, body_dict, headers=None):
     return {
         "statusCode": status_code,
         "headers": {
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization",
-            "Content-Type": "application/json"
+            "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match",
+            "Access-Control-Expose-Headers": "ETag,Retry-After",
+            "Content-Type": "application/json",
+            **(headers or {})
         },
         "body": json.dumps(body_dict)
     }
 
 
-def start_task():
+def request_header(event, name):
+    """Header of an API Gateway REST (any case) or HTTP API (lower case) event."""
+    name = name.lower()
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def conditional_status(event, cache_key, handler):
+    """Answer a polled status route with an ETag and a 304 when nothing changed.
+
+    Successful responses carrying a Retry-After hint (the client will poll
+    again) are cached for STATUS_CACHE_TTL seconds, so tabs polling the same
+    job or dashboard share one set of AWS calls per container.
+    """
+    now = time.monotonic()
+    cached = _status_cache.get(cache_key)
+    if cached and now < cached["expires"]:
+        response = cached["response"]
+    else:
+        response = handler()
+        if response["statusCode"] != 200:
+            return response
+        etag = '"' + hashlib.blake2b(response["body"].encode("utf-8"), digest_size=12).hexdigest() + '"'
+        response["headers"].update({"ETag": etag, "Cache-Control": "no-cache"})
+        if "Retry-After" in response["headers"] and status_cache_ttl > 0:
+            if len(_status_cache) >= STATUS_CACHE_SIZE:
+                _status_cache.pop(next(iter(_status_cache)))
+            _status_cache[cache_key] = {"response": response, "expires": now + status_cache_ttl}
+
+    if etag_matches(request_header(event, "If-None-Match"), response["headers"]["ETag"]):
+        headers = {k: v for k, v in response["headers"].items() if k != "Content-Type"}
+        return {"statusCode": 304, "headers": headers, "body": ""}
+    return {**response, "headers": dict(response["headers"])}
+
+
+# Region group tasks of an account are named "<prefix>part<group>-<account>".
+PART_FAMILY_SUFFIX = re.compile(r"^(part\d+-)?\d+$")
+
+
+def family_prefix(family):
+    """The TASK_FAMILY_PREFIXES entry of a Prowler task family, or None."""
+    for prefix in task_family_prefixes:
+        if family.startswith(prefix) and PART_FAMILY_SUFFIX.match(family[len(prefix):]):
+            return prefix
+    return None
+
+
+def is_prowler_family(family):
+    if not task_family_prefixes:
+        return True
+    return family_prefix(family) is not None
+
+
+def family_of(task_definition_arn):
+    return task_definition_arn.rsplit("/", 1)[-1].rpartition(":")[0]
+
+
+def expected_reports(task_definitions):
+    """Accounts per scan prefix the notifier waits for before sending the digest of a job.
+
+    An account scanned per region group reports once, after its parts are merged.
+    """
+    accounts = {}
+    for task_definition in task_definitions:
+        prefix = family_prefix(family_of(task_definition))
+        if prefix:
+            accounts.setdefault(prefix, set()).add(account_from_task_definition(task_definition))
+    return {prefix: len(prefix_accounts) for prefix, prefix_accounts in accounts.items()}
+
+
+def discover_task_definitions():
+    """Return the latest ACTIVE revision of every Prowler task definition family.
+
+    The result is cached in the warm container for TASK_DEFINITION_CACHE_TTL seconds.
+    """
+    now = time.monotonic()
+    if _task_definition_cache["arns"] is not None and now < _task_definition_cache["expires"]:
+        return _task_definition_cache["arns"]
+
+    latest = {}
+    paginator = ecs_client.get_paginator('list_task_definitions')
+    for page in paginator.paginate(status='ACTIVE'):
+        for arn in page.get('taskDefinitionArns', []):
+            family, _, revision = arn.rsplit('/', 1)[-1].rpartition(':')
+            if not is_prowler_family(family):
+                continue
+            if family not in latest or int(revision) > latest[family][0]:
+                latest[family] = (int(revision), arn)
+
+    arns = [arn for _, (_, arn) in sorted(latest.items())]
+    _task_definition_cache.update(arns=arns, expires=now + task_definition_cache_ttl)
+    print(f"Discovered {len(arns)} Prowler task definitions")
+    return arns
+
+
+def account_from_task_definition(task_definition_arn):
+    match = re.search(r"-(\d+):\d+$", task_definition_arn)
+    return match.group(1) if match else None
+
+
+def read_run_history(family):
+    key = f"{run_history_prefix}{family}.json"
+    try:
+        return json.loads(s3_client.get_object(Bucket=report_bucket, Key=key)['Body'].read())
+    except ClientError as e:
+        # Without s3:ListBucket on the key, S3 answers a missing object with AccessDenied.
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404", "AccessDenied"):
+            return []
+        raise
+
+
+def fargate_size(cpu, memory):
+    """Round a size up to a valid Fargate CPU and memory combination."""
+    cpu = max(FARGATE_MIN_CPU, min(cpu, auto_sizing_max_cpu))
+    while memory > FARGATE_MEMORY_RANGES[cpu][1] and cpu < auto_sizing_max_cpu:
+        cpu *= 2
+    low, high, step = FARGATE_MEMORY_RANGES[cpu]
+    memory = max(low, min(memory, high))
+    if cpu == FARGATE_MIN_CPU:
+        return cpu, next(size for size in (512, 1024, 2048) if size >= memory)
+    return cpu, -(-memory // step) * step
+
+
+def auto_size(task_definition):
+    """Choose CPU and memory for an auto-sized task from its recent runs.
+
+    Starting from the size of the last run, memory doubles when that run ran
+    out of memory and CPU doubles when runs at that size are slow. Runs at
+    other sizes say nothing about the current one, except that both only halve
+    when all recent runs were at the current size and fast, so a task that
+    just grew does not shrink back. Returns {} to keep the task definition size.
+    """
+    family = task_definition.rsplit('/', 1)[-1].rpartition(':')[0]
+    if not report_bucket or not any(family.startswith(prefix) for prefix in auto_sizing_family_prefixes):
+        return {}
     try:
-        task_defs = ecs_client.list_task_definitions()['taskDefinitionArns']
-        active_tasks = ecs_client.list_tasks(cluster=ecs_cluster)['taskArns']
-        if active_tasks:
-            return respond(409, {"error": "Scan already in progress", "taskArns": active_tasks})
+        history = [run for run in read_run_history(family) if run.get("cpu") and run.get("memory")]
+    except ClientError as e:
+        print(f"Unable to read run history of {family}: {e}")
+        return {}
+    recent = history[-auto_sizing_runs:]
+    if not recent:
+        return {}
+
+    cpu, memory = int(recent[-1]["cpu"]), int(recent[-1]["memory"])
+    current = [run for run in recent if int(run["cpu"]) == cpu and int(run["memory"]) == memory]
+    runtimes = sorted(run["runtime_seconds"] for run in current if run.get("runtime_seconds") is not None)
+    if recent[-1].get("out_of_memory"):
+        memory *= 2
+    elif runtimes and runtimes[len(runtimes) // 2] > auto_sizing_slow_seconds:
+        cpu *= 2
+    elif (len(runtimes) >= 3 and runtimes[-1] < auto_sizing_fast_seconds
+          and len(current) == len(recent) and not any(run.get("out_of_memory") for run in recent)):
+        cpu, memory = cpu // 2, memory // 2
+    cpu, memory = fargate_size(cpu, memory)
+    print(f"Auto-sized {family} to {cpu} CPU units and {memory} MiB")
+    return {"cpu": str(cpu), "memory": str(memory)}
+
 
-        started_tasks = []
-        for td in task_defs:
-            resp = ecs_client.run_task(
+def run_task_with_retry(task_definition, deadline, job_id=None):
+    """Start one task, backing off on throttling until ``deadline``.
+
+    Returns a dict with either ``taskArns``, ``failure`` or ``deferred`` set.
+    """
+    result = {"taskDefinition": task_definition, "account": account_from_task_definition(task_definition)}
+    size = auto_size(task_definition)
+    for attempt in range(run_task_max_attempts):
+        if time.monotonic() >= deadline:
+            result["deferred"] = True
+            return result
+        try:
+            resp = run_task_ecs_client.run_task(
                 cluster=ecs_cluster,
                 launchType='FARGATE',
-                taskDefinition=td,
+                taskDefinition=task_definition,
                 count=1,
                 platformVersion='LATEST',
                 networkConfiguration={
@@ -73,17 +403,652 @@ def start_task():
                         'subnets': [ecs_subnet],
                         'assignPublicIp': 'ENABLED'
                     }
-                }
+                },
+                **({'startedBy': job_id} if job_id else {}),
+                **({'overrides': size} if size else {})
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code not in THROTTLING_ERROR_CODES or attempt == run_task_max_attempts - 1:
+                result["failure"] = str(e)
+                return result
+            backoff = min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+            if time.monotonic() + backoff >= deadline:
+                result["deferred"] = True
+                return result
+            print(f"RunTask throttled for {task_definition} ({code}), retrying in {backoff:.1f}s")
+            time.sleep(backoff)
+            continue
+
+        task_arns = [t['taskArn'] for t in resp.get("tasks", [])]
+        if task_arns:
+            result["taskArns"] = task_arns
+        else:
+            reasons = [f.get("reason", "UNKNOWN") for f in resp.get("failures", [])]
+            result["failure"] = ", ".join(reasons) or "No task started"
+        return result
+
+    result["failure"] = "Exceeded RunTask retry attempts"
+    return result
+
+
+def run_tasks(task_definitions, deadline, job_id=None):
+    """Fan RunTask out over a bounded thread pool.
+
+    Returns the started task ARNs, per-account failures and the task
+    definitions that could not be started before ``deadline`` (monotonic).
+    """
+    started, failures, deferred = [], [], []
+    with ThreadPoolExecutor(max_workers=max(1, run_task_concurrency)) as executor:
+        results = executor.map(lambda td: run_task_with_retry(td, deadline, job_id), task_definitions)
+        for result in results:
+            if result.get("deferred"):
+                deferred.append(result["taskDefinition"])
+            elif "failure" in result:
+                failures.append({
+                    "account": result["account"],
+                    "taskDefinition": result["taskDefinition"],
+                    "reason": result["failure"]
+                })
+            else:
+                started.extend(result["taskArns"])
+    return started, failures, deferred
+
+
+def hand_off_task_definitions(task_definitions, context, job_id=None):
+    """Invoke this function asynchronously to start the remaining tasks."""
+    payload = {"action": RUN_TASKS_ACTION, "taskDefinitions": task_definitions, "jobId": job_id}
+    lambda_client.invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps(payload).encode("utf-8")
+    )
+    print(f"Handed off {len(task_definitions)} task definitions to asynchronous invocation")
+
+
+def run_tasks_async(event):
+    task_definitions = event.get("taskDefinitions", [])
+    job_id = event.get("jobId")
+    # Asynchronous invocations are bounded by the Lambda timeout, not API Gateway.
+    started, failures, deferred = run_tasks(task_definitions, float("inf"), job_id)
+    record_start_failures(job_id, failures)
+    for failure in failures:
+        print(f"Failed to start task for account {failure['account']}: {failure['reason']}")
+    if failures:
+        # Tasks that never started emit no events, so hand their slots to the queue now.
+        drain_queues()
+    print(f"Asynchronously started {len(started)} of {len(task_definitions)} ECS tasks")
+    return {"taskArns": started, "failures": failures, "deferred": deferred}
+
+
+def parse_body(event):
+    body = event.get("body") or "{}"
+    if event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode("utf-8")
+    return json.loads(body)
+
+
+def list_active_tasks():
+    """Return the descriptions of all tasks on the cluster that have not stopped."""
+    paginator = ecs_client.get_paginator('list_tasks')
+    task_arns = [arn for page in paginator.paginate(cluster=ecs_cluster) for arn in page.get('taskArns', [])]
+    return [t for t in describe_tasks(task_arns) if t.get('lastStatus') != "STOPPED"]
+
+
+def scan_priority(task_definitions, deadline):
+    """Order task definitions: critical accounts, then recently changed ones, then the least recently scanned.
+
+    An account has changed when its FAIL count differs between its last two
+    report summaries, or when it has never been scanned. Summaries not listed
+    or read within SCAN_PRIORITY_BUDGET_SECONDS (or before ``deadline``) are
+    skipped; accounts the listing did not reach are not taken as unscanned.
+    """
+    deadline = min(deadline, time.monotonic() + scan_priority_budget_seconds)
+    history = {}
+    complete = True
+    if report_bucket:
+        try:
+            history, complete = list_summary_objects(deadline)
+        except ClientError as e:
+            print("Unable to read scan history for prioritization:", str(e))
+        if not complete:
+            print(f"Listed summaries of {len(history)} accounts, prioritization ran out of time")
+
+    accounts = {td: account_from_task_definition(td) for td in task_definitions}
+    last_two = [obj for account in set(accounts.values()) for obj in history.get(account, [])[-2:]]
+    summaries = {}
+    if last_two and time.monotonic() < deadline:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(summary_read_concurrency, len(last_two))))
+        futures = {executor.submit(read_summary, obj): obj['Key'] for obj in last_two}
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        executor.shutdown(wait=False, cancel_futures=True)
+        summaries = {futures[future]: future.result() for future in done if not future.exception()}
+        if not_done:
+            print(f"Ordered {len(not_done)} summaries by last scan only, prioritization ran out of time")
+
+    def fail_count(obj):
+        summary = summaries.get(obj['Key'])
+        return sum(summary["failBySeverity"].values()) if summary else None
+
+    def key(td):
+        account = accounts[td]
+        scans = history.get(account, [])
+        counts = [fail_count(obj) for obj in scans[-2:]] if len(scans) > 1 else []
+        changed = (not scans and complete) or (len(counts) == 2 and None not in counts and counts[0] != counts[1])
+        last_scan = scans[-1]['LastModified'].timestamp() if scans else 0.0
+        return (account not in critical_accounts, not changed, last_scan, td)
+
+    return sorted(task_definitions, key=key)
+
+
+def start_task(event, context):
+    budget = start_task_budget_seconds
+    if context is not None:
+        budget = min(budget, context.get_remaining_time_in_millis() / 1000 - 5)
+    deadline = time.monotonic() + budget
+    try:
+        body = parse_body(event)
+    except ValueError:
+        return respond(400, {"error": "Request body must be JSON"})
+    requested = body.get("accounts")
+    if requested is not None and not isinstance(requested, list):
+        return respond(400, {"error": "accounts must be a list"})
+
+    try:
+        task_defs = discover_task_definitions()
+        if requested:
+            requested = {str(account) for account in requested}
+            task_defs = [td for td in task_defs if account_from_task_definition(td) in requested]
+            unknown = requested - {account_from_task_definition(td) for td in task_defs}
+            if unknown:
+                return respond(400, {"error": "Unknown accounts", "accounts": sorted(unknown)})
+
+        # Skip accounts whose scan is still running, or queued in another job,
+        # instead of refusing the whole request. An account scanned per region
+        # group is running while any of its tasks is.
+        active_tasks = list_active_tasks()
+        active_accounts = {}
+        for t in active_tasks:
+            active_accounts.setdefault(account_from_task_definition(t['taskDefinitionArn']), t)
+        waiting_accounts = queued_accounts()
+        busy_accounts = set(active_accounts) | set(waiting_accounts)
+        skipped = sorted({account_from_task_definition(td) for td in task_defs} & busy_accounts)
+        task_defs = [td for td in task_defs if account_from_task_definition(td) not in busy_accounts]
+        if not task_defs:
+            job_ids = (
+                active_accounts[account].get('startedBy') or "" if account in active_accounts
+                else waiting_accounts[account]
+                for account in skipped
             )
-            tasks = resp.get("tasks", [])
-            started_tasks.extend([t['taskArn'] for t in tasks])
+            return respond(409, {
+                "error": "Scan already in progress",
+                "accounts": skipped,
+                "taskArns": [active_accounts[account]['taskArn'] for account in skipped if account in active_accounts],
+                "jobId": next((job_id for job_id in job_ids if JOB_ID_PATTERN.match(job_id)), None)
+            })
 
-        return respond(200, {"taskArns": started_tasks, "message": f"{len(started_tasks)} ECS tasks started."})
+        task_defs = scan_priority(task_defs, deadline)
+        queued = []
+        if scan_concurrency > 0 and job_table is not None:
+            slots = max(0, scan_concurrency - len(active_tasks))
+            task_defs, queued = task_defs[:slots], task_defs[slots:]
+
+        job_id = create_job(task_defs + queued, queued)
+        started_tasks, failures, deferred = run_tasks(task_defs, deadline, job_id)
+        record_start_failures(job_id, failures)
+        if queued and (failures or not task_defs) and context is not None:
+            # Tasks that did not start never stop, so their slots go to the queue now.
+            request_drain(context)
+
+        message = f"{len(started_tasks)} ECS tasks started."
+        if deferred:
+            hand_off_task_definitions(deferred, context, job_id)
+            message += f" {len(deferred)} more are being started in the background."
+        if queued:
+            message += f" {len(queued)} are queued until running scans finish."
+        if failures:
+            message += f" {len(failures)} tasks failed to start."
+        if skipped:
+            message += f" {len(skipped)} accounts are already being scanned or queued."
+
+        status_code = 500 if failures and not started_tasks and not deferred and not queued else 200
+        return respond(status_code, {
+            "jobId": job_id,
+            "taskArns": started_tasks,
+            "failures": failures,
+            "deferredCount": len(deferred),
+            "queuedCount": len(queued),
+            "skippedAccounts": skipped,
+            "message": message
+        })
     except Exception as e:
         print("Error starting ECS task:", str(e))
         return respond(500, {"error": str(e)})
 
 
+def create_job(task_definitions, queue=()):
+    """Create the job record before any task starts, so no state change is missed.
+
+    ``queue`` holds the task definitions, in priority order, that are started
+    as tasks of the job stop. Each one is stored as its own item.
+    """
+    if job_table is None:
+        return None
+    job_id = uuid.uuid4().hex
+    now = int(time.time())
+    job_table.put_item(Item={
+        "job_id": job_id,
+        "sk": JOB_ITEM,
+        "created_at": now,
+        "expires_at": now + job_ttl_seconds,
+        "task_count": len(task_definitions),
+        **dict.fromkeys(JOB_COUNTERS, 0),
+        "queued": len(queue),
+        "pending": len(task_definitions) - len(queue),
+        "expected_reports": expected_reports(task_definitions),
+        **({"queue_state": QUEUE_STATE_QUEUED} if queue else {}),
+    })
+    with job_table.batch_writer() as batch:
+        for position, task_definition in enumerate(queue):
+            batch.put_item(Item={
+                "job_id": job_id,
+                "sk": f"{QUEUE_ITEM_PREFIX}{position:06d}",
+                "task_definition": task_definition,
+                "expires_at": now + job_ttl_seconds,
+            })
+    return job_id
+
+
+def is_conflict(error):
+    return error.response.get("Error", {}).get("Code") in (
+        "ConditionalCheckFailedException", "TransactionCanceledException"
+    )
+
+
+def take_queued_task_definitions(job_id, count):
+    """Remove up to ``count`` task definitions from the head of the job queue.
+
+    Each entry is deleted in a transaction with the job counters, so an entry
+    taken by a concurrent invocation is skipped rather than started twice.
+    """
+    taken = []
+    for _ in range(JOB_UPDATE_ATTEMPTS):
+        if len(taken) >= count:
+            break
+        items = job_table.query(
+            KeyConditionExpression="job_id = :job AND begins_with(sk, :queue)",
+            ExpressionAttributeValues={":job": job_id, ":queue": QUEUE_ITEM_PREFIX},
+            ConsistentRead=True,
+            Limit=count - len(taken)
+        ).get("Items", [])
+        if not items:
+            clear_queue_state(job_id)
+            break
+        for item in items:
+            try:
+                job_table.meta.client.transact_write_items(TransactItems=[
+                    {"Delete": {
+                        "TableName": job_table_name,
+                        "Key": {"job_id": job_id, "sk": item["sk"]},
+                        "ConditionExpression": "attribute_exists(sk)"
+                    }},
+                    {"Update": {
+                        "TableName": job_table_name,
+                        "Key": {"job_id": job_id, "sk": JOB_ITEM},
+                        "UpdateExpression": "ADD #queued :minus_one, #pending :one",
+                        "ExpressionAttributeNames": {"#queued": "queued", "#pending": "pending"},
+                        "ExpressionAttributeValues": {":one": 1, ":minus_one": -1}
+                    }}
+                ])
+            except ClientError as e:
+                if not is_conflict(e):
+                    raise
+                continue
+            taken.append(item["task_definition"])
+    return taken
+
+
+def clear_queue_state(job_id):
+    """Drop a job with an empty queue from the queued_jobs index."""
+    try:
+        job_table.update_item(
+            Key={"job_id": job_id, "sk": JOB_ITEM},
+            UpdateExpression="REMOVE queue_state",
+            ConditionExpression="attribute_exists(queue_state) AND #queued <= :zero",
+            ExpressionAttributeNames={"#queued": "queued"},
+            ExpressionAttributeValues={":zero": 0}
+        )
+    except ClientError as e:
+        if not is_conflict(e):
+            raise
+
+
+def start_queued_tasks(job_id, count):
+    """Take up to ``count`` task definitions off the job queue and start them.
+
+    Returns the number of task definitions taken off the queue and the ARNs
+    of the tasks that started.
+    """
+    task_definitions = take_queued_task_definitions(job_id, count)
+    if not task_definitions:
+        return 0, []
+    started, failures, _ = run_tasks(task_definitions, float("inf"), job_id)
+    record_start_failures(job_id, failures)
+    print(f"Started {len(started)} queued tasks of job {job_id}")
+    return len(task_definitions), started
+
+
+def queued_job_ids():
+    """Ids of the jobs with queued tasks, oldest first."""
+    kwargs = {
+        "IndexName": QUEUED_JOBS_INDEX,
+        "KeyConditionExpression": "queue_state = :queued",
+        "ExpressionAttributeValues": {":queued": QUEUE_STATE_QUEUED}
+    }
+    while True:
+        page = job_table.query(**kwargs)
+        yield from (item["job_id"] for item in page.get("Items", []))
+        if "LastEvaluatedKey" not in page:
+            return
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+def queued_accounts():
+    """Accounts waiting in the queue of a job, with the id of that job."""
+    if job_table is None or scan_concurrency <= 0:
+        return {}
+    accounts = {}
+    for job_id in queued_job_ids():
+        kwargs = {
+            "KeyConditionExpression": "job_id = :job AND begins_with(sk, :queue)",
+            "ExpressionAttributeValues": {":job": job_id, ":queue": QUEUE_ITEM_PREFIX},
+            "ProjectionExpression": "task_definition"
+        }
+        while True:
+            page = job_table.query(**kwargs)
+            for item in page.get("Items", []):
+                accounts.setdefault(account_from_task_definition(item["task_definition"]), job_id)
+            if "LastEvaluatedKey" not in page:
+                break
+            kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+    return accounts
+
+
+def count_active_tasks():
+    """Number of tasks on the cluster that have not been asked to stop."""
+    paginator = ecs_client.get_paginator('list_tasks')
+    return sum(len(page.get('taskArns', [])) for page in paginator.paginate(cluster=ecs_cluster))
+
+
+def acquire_drain_lease(owner):
+    now = int(time.time())
+    try:
+        job_table.put_item(
+            Item={**DRAIN_LEASE_KEY, "owner": owner, "lease_until": now + drain_lease_seconds,
+                  "expires_at": now + drain_lease_seconds},
+            ConditionExpression="attribute_not_exists(job_id) OR lease_until < :now",
+            ExpressionAttributeValues={":now": now}
+        )
+    except ClientError as e:
+        if not is_conflict(e):
+            raise
+        return False
+    return True
+
+
+def release_drain_lease(owner):
+    try:
+        job_table.delete_item(
+            Key=DRAIN_LEASE_KEY,
+            ConditionExpression="#owner = :owner",
+            ExpressionAttributeNames={"#owner": "owner"},
+            ExpressionAttributeValues={":owner": owner}
+        )
+    except ClientError as e:
+        if not is_conflict(e):
+            raise
+
+
+def drain_queues():
+    """Start queued tasks, oldest job first, while fewer than SCAN_CONCURRENCY tasks run.
+
+    Returns the number of tasks started. Does nothing while another
+    invocation holds the drain lease; the scheduled sweep catches up.
+    """
+    if job_table is None or scan_concurrency <= 0:
+        return 0
+    owner = uuid.uuid4().hex
+    if not acquire_drain_lease(owner):
+        print("Another invocation is starting queued tasks")
+        return 0
+    started = 0
+    try:
+        free = scan_concurrency - count_active_tasks()
+        for job_id in queued_job_ids():
+            while free > 0:
+                taken, job_started = start_queued_tasks(job_id, free)
+                if not taken:
+                    break
+                # Tasks that failed to start do not take a slot.
+                free -= len(job_started)
+                started += len(job_started)
+            if free <= 0:
+                break
+    finally:
+        release_drain_lease(owner)
+    return started
+
+
+def request_drain(context):
+    """Start queued tasks in an asynchronous invocation, outside the API Gateway timeout."""
+    lambda_client.invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps({"action": DRAIN_QUEUES_ACTION}).encode("utf-8")
+    )
+
+
+def record_start_failures(job_id, failures):
+    if job_table is None or not job_id or not failures:
+        return
+    expires_at = int(time.time()) + job_ttl_seconds
+    with job_table.batch_writer(overwrite_by_pkeys=["job_id", "sk"]) as batch:
+        for failure in failures:
+            batch.put_item(Item={
+                "job_id": job_id,
+                "sk": f"{FAILURE_ITEM_PREFIX}{failure['taskDefinition']}",
+                **failure,
+                "expires_at": expires_at,
+            })
+    job_table.update_item(
+        Key={"job_id": job_id, "sk": JOB_ITEM},
+        UpdateExpression="ADD #failed :count, #pending :minus_count",
+        ExpressionAttributeNames={"#failed": "failed", "#pending": "pending"},
+        ExpressionAttributeValues={":count": len(failures), ":minus_count": -len(failures)}
+    )
+    # Accounts that did not start never report, so the digest of the job does
+    # not wait for them. Region group tasks are still reported by the merge.
+    unreported = Counter()
+    for failure in failures:
+        family = family_of(failure["taskDefinition"])
+        prefix = family_prefix(family)
+        if prefix and not family[len(prefix):].startswith("part"):
+            unreported[prefix] += 1
+    if not unreported:
+        return
+    names, values, assignments = {}, {}, []
+    for position, (prefix, count) in enumerate(unreported.items()):
+        names[f"#prefix{position}"] = prefix
+        values[f":unreported{position}"] = count
+        assignments.append(
+            f"expected_reports.#prefix{position} = expected_reports.#prefix{position} - :unreported{position}"
+        )
+    try:
+        job_table.update_item(
+            Key={"job_id": job_id, "sk": JOB_ITEM},
+            UpdateExpression="SET " + ", ".join(assignments),
+            ConditionExpression="attribute_exists(expected_reports)",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+    except ClientError as e:
+        print(f"Unable to update the expected reports of job {job_id}:", str(e))
+
+
+def job_counter(status, exit_code):
+    """The job counter a task with this status and exit code is counted under."""
+    if status in PENDING_STATUSES:
+        return "pending"
+    if status != "STOPPED":
+        return "running"
+    if exit_code == 0:
+        return "succeeded"
+    if exit_code == FINDINGS_EXIT_CODE:
+        return "findings"
+    return "failed"
+
+
+def record_task_state_change(event):
+    """Store the state of a task started by a scan job from an ECS Task State Change event.
+
+    The task item and the job counters are updated in one transaction,
+    conditional on the version read, so the counters stay exact when events
+    are retried, duplicated or arrive out of order.
+    """
+    detail = event.get("detail", {})
+    job_id = detail.get("startedBy") or ""
+    task_arn = detail.get("taskArn")
+    if job_table is None or not JOB_ID_PATTERN.match(job_id) or not task_arn:
+        return {"recorded": False}
+
+    exit_codes = [c.get("exitCode") for c in detail.get("containers", []) if c.get("exitCode") is not None]
+    state = {
+        "job_id": job_id,
+        "sk": f"{TASK_ITEM_PREFIX}{task_arn}",
+        "status": detail.get("lastStatus", "UNKNOWN"),
+        "version": detail.get("version", 0),
+        "account": account_from_task_definition(detail.get("taskDefinitionArn", "")),
+        "exitCode": max(exit_codes) if exit_codes else None,
+        "stoppedReason": detail.get("stoppedReason"),
+        "expires_at": int(time.time()) + job_ttl_seconds
+    }
+    key = {"job_id": job_id, "sk": state["sk"]}
+    for _ in range(JOB_UPDATE_ATTEMPTS):
+        previous = job_table.get_item(Key=key, ConsistentRead=True).get("Item")
+        # Events can arrive out of order; only move a task forward.
+        if previous and previous["version"] >= state["version"]:
+            return {"recorded": False}
+        # Launched tasks are counted as pending until their first event.
+        old = job_counter(previous["status"], previous.get("exitCode")) if previous else "pending"
+        new = job_counter(state["status"], state["exitCode"])
+        job_write = {
+            "TableName": job_table_name,
+            "Key": {"job_id": job_id, "sk": JOB_ITEM},
+            "ConditionExpression": "attribute_exists(job_id)"
+        }
+        if old != new:
+            job_write = {"Update": {
+                **job_write,
+                "UpdateExpression": "ADD #old :minus_one, #new :one",
+                "ExpressionAttributeNames": {"#old": old, "#new": new},
+                "ExpressionAttributeValues": {":one": 1, ":minus_one": -1}
+            }}
+        else:
+            job_write = {"ConditionCheck": job_write}
+        try:
+            job_table.meta.client.transact_write_items(TransactItems=[
+                {"Put": {
+                    "TableName": job_table_name,
+                    "Item": state,
+                    **({
+                        "ConditionExpression": "version = :version",
+                        "ExpressionAttributeValues": {":version": previous["version"]}
+                    } if previous else {"ConditionExpression": "attribute_not_exists(sk)"})
+                }},
+                job_write
+            ])
+        except ClientError as e:
+            if not is_conflict(e):
+                raise
+            # Either not a job of ours, or another event of this task won the race.
+            if previous is None and not job_table.get_item(Key={"job_id": job_id, "sk": JOB_ITEM}).get("Item"):
+                return {"recorded": False}
+            continue
+
+        return {"recorded": True}
+    return {"recorded": False}
+
+
+def handle_task_state_change(event):
+    """Record the state of job tasks; a stopped scan task of any job or schedule frees a slot."""
+    result = record_task_state_change(event)
+    detail = event.get("detail", {})
+    family = detail.get("taskDefinitionArn", "").rsplit('/', 1)[-1].rpartition(':')[0]
+    if detail.get("lastStatus") == "STOPPED" and is_prowler_family(family):
+        result["queuedStarted"] = drain_queues()
+    return result
+
+
+def summarize_job(job):
+    return {counter: max(0, int(job.get(counter, 0))) for counter in JOB_COUNTERS}
+
+
+def check_job_status(job_id):
+    if job_table is None:
+        return respond(400, {"error": "Job tracking is not configured"})
+    try:
+        job = job_table.get_item(Key={"job_id": job_id, "sk": JOB_ITEM}).get("Item")
+        if not job:
+            return respond(404, {"error": "Job not found"})
+
+        counts = summarize_job(job)
+        in_progress = counts["queued"] + counts["pending"] + counts["running"] > 0
+        headers = {}
+        if in_progress:
+            phase = "running" if counts["running"] and not counts["pending"] else "starting"
+            headers["Retry-After"] = str(TASK_STATUS_RETRY_AFTER[phase])
+        return respond(200, {
+            "jobId": job_id,
+            "status": "IN_PROGRESS" if in_progress else "STOPPED",
+            "total": int(job.get("task_count", 0)),
+            "counts": counts
+        }, headers)
+    except Exception as e:
+        print("Error checking scan job status:", str(e))
+        return respond(500, {"error": str(e)})
+
+
+def remember_stopped_task(task_arn):
+    if len(_stopped_task_cache) >= stopped_task_cache_size:
+        _stopped_task_cache.pop(next(iter(_stopped_task_cache)))
+    _stopped_task_cache[task_arn] = "STOPPED"
+
+
+def describe_tasks(task_arns):
+    """Describe tasks in chunks of DESCRIBE_TASKS_CHUNK_SIZE, concurrently."""
+    task_arns = list(dict.fromkeys(task_arns))
+    chunks = [task_arns[i:i + DESCRIBE_TASKS_CHUNK_SIZE] for i in range(0, len(task_arns), DESCRIBE_TASKS_CHUNK_SIZE)]
+    if not chunks:
+        return []
+
+    def describe(chunk):
+        return ecs_client.describe_tasks(cluster=ecs_cluster, tasks=chunk).get('tasks', [])
+
+    with ThreadPoolExecutor(max_workers=max(1, min(describe_tasks_concurrency, len(chunks)))) as executor:
+        return [t for tasks in executor.map(describe, chunks) for t in tasks]
+
+
+def describe_task_statuses(task_arns):
+    """Return {taskArn: lastStatus}, describing only tasks not known to be STOPPED."""
+    statuses = {arn: _stopped_task_cache[arn] for arn in task_arns if arn in _stopped_task_cache}
+    for t in describe_tasks(arn for arn in task_arns if arn not in statuses):
+        status = t.get('lastStatus', 'UNKNOWN')
+        statuses[t['taskArn']] = status
+        if status == "STOPPED":
+            remember_stopped_task(t['taskArn'])
+    return statuses
+
+
 def check_task_status(task_arns_string):
     if not task_arns_string:
         return respond(400, {"error": "Missing taskArns"})
@@ -92,23 +1057,228 @@ def check_task_status(task_arns_string):
         if not isinstance(task_arns, list):
             return respond(400, {"error": "taskArns must be a list"})
 
-        resp = ecs_client.describe_tasks(cluster=ecs_cluster, tasks=task_arns)
-        tasks = resp.get('tasks', [])
-        if not tasks:
+        statuses = describe_task_statuses(task_arns)
+        if not statuses:
             return respond(404, {"error": "Tasks not found"})
 
-        statuses = {t['taskArn']: t.get('lastStatus', 'UNKNOWN') for t in tasks}
         all_stopped = all(s == "STOPPED" for s in statuses.values())
-        return respond(200, {"status": "STOPPED" if all_stopped else "IN_PROGRESS", "details": statuses})
+        headers = {}
+        if not all_stopped:
+            phase = "starting" if any(s in PENDING_STATUSES for s in statuses.values()) else "running"
+            headers["Retry-After"] = str(TASK_STATUS_RETRY_AFTER[phase])
+        return respond(200, {"status": "STOPPED" if all_stopped else "IN_PROGRESS", "details": statuses}, headers)
     except Exception as e:
         print("Error checking ECS task statuses:", str(e))
         return respond(500, {"error": str(e)})
 
 
+def list_summary_objects(deadline=float("inf")):
+    """Return {account: [summary object, ...]} sorted oldest first, and whether the listing is complete.
+
+    Listing stops at ``deadline`` (time.monotonic()). A complete listing is
+    cached in the warm container for FINDINGS_SUMMARY_CACHE_TTL seconds.
+    """
+    now = time.monotonic()
+    if _summary_listing_cache["objects"] is not None and now < _summary_listing_cache["expires"]:
+        return _summary_listing_cache["objects"], True
+
+    by_account = {}
+    complete = True
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=report_bucket, Prefix=report_summary_prefix):
+        for obj in page.get('Contents', []):
+            if not obj['Key'].endswith(".json"):
+                continue
+            match = summary_account_pattern.match(obj['Key'].rsplit("/", 1)[-1])
+            if not match:
+                continue
+            by_account.setdefault(match.group(1), []).append(obj)
+        if page.get('IsTruncated') and time.monotonic() >= deadline:
+            complete = False
+            break
+
+    for objects in by_account.values():
+        objects.sort(key=lambda obj: (obj['LastModified'], obj['Key']))
+    if complete:
+        _summary_listing_cache.update(objects=by_account, expires=now + findings_summary_cache_ttl)
+    return by_account, complete
+
+
+def read_summary(obj):
+    """Return the fields of a summary used by the API, cached by key and ETag."""
+    cache_key = (obj['Key'], obj.get('ETag'))
+    if cache_key in _summary_cache:
+        return _summary_cache[cache_key]
+
+    summary = json.loads(s3_client.get_object(Bucket=report_bucket, Key=obj['Key'])['Body'].read())
+    entry = {
+        "reportKey": summary.get("report_key"),
+        "generatedAt": summary.get("generated_at"),
+        "failBySeverity": summary.get("fail_by_severity", {}),
+        "failByCheck": summary.get("fail_by_check", {})
+    }
+    if len(_summary_cache) >= summary_cache_size:
+        _summary_cache.pop(next(iter(_summary_cache)))
+    _summary_cache[cache_key] = entry
+    return entry
+
+
+def parse_list_param(value):
+    return {item.strip().lower() for item in (value or "").split(",") if item.strip()}
+
+
+def findings_summary_handler(params):
+    """Per-account and per-severity FAIL counts of the last K scans, without the dashboard.
+
+    Query parameters: account and severity (comma-separated lists) and scans (K).
+    """
+    if not report_bucket:
+        return respond(500, {"error": "REPORT_BUCKET is not configured"})
+    try:
+        scans = int(params.get("scans") or findings_summary_default_scans)
+    except ValueError:
+        return respond(400, {"error": "scans must be an integer"})
+    scans = max(1, min(scans, FINDINGS_SUMMARY_MAX_SCANS))
+    accounts = parse_list_param(params.get("account"))
+    severities = parse_list_param(params.get("severity"))
+
+    try:
+        selected = {
+            account: objects[-scans:]
+            for account, objects in list_summary_objects()[0].items()
+            if not accounts or account in accounts
+        }
+        objects = [obj for account_objects in selected.values() for obj in account_objects]
+        with ThreadPoolExecutor(max_workers=max(1, min(summary_read_concurrency, len(objects) or 1))) as executor:
+            summaries = dict(zip((obj['Key'] for obj in objects), executor.map(read_summary, objects)))
+
+        result = []
+        total_by_severity = {}
+        for account, account_objects in sorted(selected.items()):
+            trend = []
+            for obj in account_objects:
+                summary = summaries[obj['Key']]
+                by_severity = {
+                    severity: count for severity, count in summary["failBySeverity"].items()
+                    if not severities or severity.lower() in severities
+                }
+                trend.append({
+                    "reportKey": summary["reportKey"],
+                    "generatedAt": summary["generatedAt"],
+                    "fail": sum(by_severity.values()),
+                    "failBySeverity": by_severity
+                })
+            if not trend:
+                continue
+
+            latest = trend[-1]
+            for severity, count in latest["failBySeverity"].items():
+                total_by_severity[severity] = total_by_severity.get(severity, 0) + count
+            # Per-check counts are not split by severity, so they are only returned unfiltered.
+            top_checks = [] if severities else sorted(
+                summaries[account_objects[-1]['Key']]["failByCheck"].items(),
+                key=lambda item: (-item[1], item[0])
+            )[:FINDINGS_SUMMARY_TOP_CHECKS]
+            result.append({
+                "account": account,
+                "latest": latest,
+                "change": latest["fail"] - trend[-2]["fail"] if len(trend) > 1 else None,
+                "topChecks": [{"checkId": check_id, "count": count} for check_id, count in top_checks],
+                "trend": trend
+            })
+
+        return respond(200, {
+            "scans": scans,
+            "accounts": result,
+            "totals": {"fail": sum(total_by_severity.values()), "failBySeverity": total_by_severity}
+        })
+    except Exception as e:
+        print("Error building findings summary:", str(e))
+        return respond(500, {"error": str(e)})
+
+
+def query_scan_durations(days, limit, scan):
+    """Aggregate the EMF task and report metrics per account with Logs Insights."""
+    scan_filter = f' and (Scan = "{scan}" or ispresent(ReportBytes))' if scan else ""
+    query = (
+        f"filter ispresent(Account) and (ispresent(RuntimeSeconds) or ispresent(ReportBytes)){scan_filter}"
+        " | stats count(RuntimeSeconds) as runs, avg(RuntimeSeconds) as avgRuntimeSeconds,"
+        " max(RuntimeSeconds) as maxRuntimeSeconds, avg(StartLatencySeconds) as avgStartLatencySeconds,"
+        " avg(QueueWaitSeconds) as avgQueueWaitSeconds, sum(EstimatedCost) as totalCost,"
+        " max(ReportBytes) as maxReportBytes, avg(FindingsCount) as avgFindings,"
+        " latest(Cpu) as cpu, latest(Memory) as memory by Account"
+        " | filter runs > 0"
+        f" | sort maxRuntimeSeconds desc | limit {limit}"
+    )
+    end = int(time.time())
+    query_id = logs_client.start_query(
+        logGroupNames=metrics_log_groups,
+        startTime=end - days * 86400,
+        endTime=end,
+        queryString=query
+    )["queryId"]
+
+    deadline = time.monotonic() + SCAN_DURATIONS_QUERY_BUDGET_SECONDS
+    while True:
+        result = logs_client.get_query_results(queryId=query_id)
+        if result["status"] == "Complete":
+            break
+        if result["status"] in ("Failed", "Cancelled", "Timeout", "Unknown"):
+            raise RuntimeError(f"Scan durations query ended with status {result['status']}")
+        if time.monotonic() >= deadline:
+            logs_client.stop_query(queryId=query_id)
+            raise TimeoutError("Scan durations query did not finish in time")
+        time.sleep(0.5)
+
+    accounts = []
+    for row in result["results"]:
+        fields = {field["field"]: field["value"] for field in row}
+        entry = {"account": fields.get("Account")}
+        for name, value in fields.items():
+            if name == "Account":
+                continue
+            try:
+                entry[name] = round(float(value), 6)
+            except ValueError:
+                entry[name] = value
+        accounts.append(entry)
+    return accounts
+
+
+def scan_durations_handler(params):
+    """Accounts with the slowest scan tasks, with their cost, report size and task size.
+
+    Query parameters: days (default 7), limit (default 20) and scan.
+    """
+    if not metrics_log_groups:
+        return respond(500, {"error": "METRICS_LOG_GROUPS is not configured"})
+    try:
+        days = max(1, min(int(params.get("days") or 7), SCAN_DURATIONS_MAX_DAYS))
+        limit = max(1, min(int(params.get("limit") or 20), SCAN_DURATIONS_MAX_LIMIT))
+    except ValueError:
+        return respond(400, {"error": "days and limit must be integers"})
+    scan = params.get("scan")
+    if scan and not re.fullmatch(r"[\w-]+", scan):
+        return respond(400, {"error": "Invalid scan name"})
+
+    cache_key = (days, limit, scan)
+    cached = _scan_durations_cache.get(cache_key)
+    if cached and time.monotonic() < cached["expires"]:
+        return respond(200, cached["body"])
+    try:
+        body = {"days": days, "scan": scan, "accounts": query_scan_durations(days, limit, scan)}
+    except Exception as e:
+        print("Error querying scan durations:", str(e))
+        return respond(500, {"error": str(e)})
+    _scan_durations_cache[cache_key] = {"body": body, "expires": time.monotonic() + scan_durations_cache_ttl}
+    return respond(200, body)
+
+
 def launch_dashboard_handler():
+    _status_cache.pop(("dashboard",), None)
     try:
         existing = ec2_client.describe_instances(Filters=[
-            {'Name': 'tag:Name', 'Values': ['dashboard-instance']},
+            {'Name': 'tag:Name', 'Values': [DASHBOARD_INSTANCE_NAME]},
             {'Name': 'instance-state-name', 'Values': ['pending', 'running']}
         ])
         if existing['Reservations']:
@@ -119,8 +1289,23 @@ def launch_dashboard_handler():
                 "dashboardUrl": f"http://{dashboard_alb_dns}/"
             })
 
+        if dashboard_warm_pool:
+            warm_instance_id, warm_state = start_warm_dashboard()
+            if warm_state == "stopping":
+                return respond(503, {
+                    "message": "The warm dashboard instance is still stopping, retry shortly",
+                    "instanceId": warm_instance_id
+                }, {"Retry-After": str(DASHBOARD_STATUS_RETRY_AFTER["stopping"])})
+            if warm_instance_id:
+                return respond(200, {
+                    "instanceId": warm_instance_id,
+                    "message": "Starting warm dashboard instance...",
+                    "dashboardUrl": f"http://{dashboard_alb_dns}/"
+                })
+
+        # Target registration happens once the instance is running, see
+        # handle_instance_state_change and check_dashboard_status_handler.
         instance_id = launch_dashboard()
-        register_instance_with_alb(instance_id)
 
         return respond(200, {
             "instanceId": instance_id,
@@ -132,25 +1317,67 @@ def launch_dashboard_handler():
         return respond(500, {"error": str(e)})
 
 
+def start_warm_dashboard():
+    """Start a stopped warm-pool instance.
+
+    Returns (instance id, state): (None, None) when there is no warm instance,
+    and "stopping" when the reaper is still stopping it, so a second warm
+    instance is not launched next to it.
+    """
+    reservations = ec2_client.describe_instances(Filters=[
+        {'Name': 'tag:Name', 'Values': [DASHBOARD_INSTANCE_NAME]},
+        {'Name': 'tag:WarmPool', 'Values': ['true']},
+        {'Name': 'instance-state-name', 'Values': ['stopping', 'stopped']}
+    ])['Reservations']
+    instances = sorted(
+        (i for r in reservations for i in r['Instances']),
+        key=lambda i: i['State']['Name'] != 'stopped'
+    )
+    if not instances:
+        return None, None
+
+    instance_id = instances[0]['InstanceId']
+    state = instances[0]['State']['Name']
+    deadline = time.monotonic() + WARM_INSTANCE_STOP_WAIT_SECONDS
+    while state == 'stopping' and time.monotonic() < deadline:
+        time.sleep(WARM_INSTANCE_POLL_SECONDS)
+        state = ec2_client.describe_instances(
+            InstanceIds=[instance_id]
+        )['Reservations'][0]['Instances'][0]['State']['Name']
+    if state == 'stopping':
+        print(f"Warm instance {instance_id} is still stopping")
+        return instance_id, state
+    if state in ('pending', 'running'):
+        # Started by a concurrent launch while we waited.
+        return instance_id, state
+    if state != 'stopped':
+        return None, None
+
+    ec2_client.start_instances(InstanceIds=[instance_id])
+    print(f"Warm instance {instance_id} starting")
+    return instance_id, 'pending'
+
+
 def launch_dashboard():
+    tags = [
+        {'Key': 'Name', 'Value': DASHBOARD_INSTANCE_NAME},
+        {'Key': 'LaunchedBy', 'Value': 'prowler-lambda'},
+        {'Key': 'TerminateAfter', 'Value': dashboard_uptime}
+    ]
+    if dashboard_warm_pool:
+        tags.append({'Key': 'WarmPool', 'Value': 'true'})
+
     resp = ec2_client.run_instances(
         LaunchTemplate={'LaunchTemplateName': dashboard_template, 'Version': '$Latest'},
         MinCount=1,
         MaxCount=1,
         TagSpecifications=[{
             'ResourceType': 'instance',
-            'Tags': [
-                {'Key': 'Name', 'Value': 'dashboard-instance'},
-                {'Key': 'LaunchedBy', 'Value': 'prowler-lambda'},
-                {'Key': 'TerminateAfter', 'Value': dashboard_uptime}
-            ]
+            'Tags': tags
         }]
     )
     instance_id = resp['Instances'][0]['InstanceId']
-
-    waiter = ec2_client.get_waiter('instance_running')
-    waiter.wait(InstanceIds=[instance_id])
-    print(f"Instance {instance_id} is running")
+    print(f"Instance {instance_id} launched")
     return instance_id
 
 
@@ -162,10 +1389,31 @@ def register_instance_with_alb(instance_id):
     print(f"Instance {instance_id} registered with TG {dashboard_tg_arn}")
 
 
+def is_dashboard_instance(instance):
+    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+    return tags.get('Name') == DASHBOARD_INSTANCE_NAME
+
+
+def handle_instance_state_change(event):
+    """Register a dashboard instance with the ALB as soon as it reaches running."""
+    detail = event.get("detail", {})
+    instance_id = detail.get("instance-id")
+    if detail.get("state") != "running" or not instance_id:
+        return {"registered": False}
+
+    reservations = ec2_client.describe_instances(InstanceIds=[instance_id])['Reservations']
+    instances = [i for r in reservations for i in r['Instances']]
+    if not instances or not is_dashboard_instance(instances[0]):
+        return {"registered": False}
+
+    register_instance_with_alb(instance_id)
+    return {"registered": True}
+
+
 def check_dashboard_status_handler(event):
     try:
         filters = [
-            {'Name': 'tag:Name', 'Values': ['dashboard-instance']},
+            {'Name': 'tag:Name', 'Values': [DASHBOARD_INSTANCE_NAME]},
             {'Name': 'instance-state-name', 'Values': ['pending', 'running']}
         ]
         reservations = ec2_client.describe_instances(Filters=filters)['Reservations']
@@ -178,7 +1426,8 @@ def check_dashboard_status_handler(event):
         instance_state = instance['State']['Name']
 
         if instance_state == "pending":
-            return respond(200, {"status": "starting", "instanceId": instance_id})
+            return respond(200, {"status": "starting", "instanceId": instance_id},
+                           {"Retry-After": str(DASHBOARD_STATUS_RETRY_AFTER["starting"])})
 
         tg_health = elbv2_client.describe_target_health(
             TargetGroupArn=dashboard_tg_arn
@@ -190,7 +1439,11 @@ def check_dashboard_status_handler(event):
                 target_status = target['TargetHealth']['State']
                 break
 
-        if target_status == "healthy":
+        if target_status == "unknown":
+            # Fallback for a missed state-change event; registering twice is a no-op.
+            register_instance_with_alb(instance_id)
+            dashboard_status = "initializing"
+        elif target_status == "healthy":
             dashboard_status = "ready"
         elif target_status in ["initial", "unused", "draining"]:
             dashboard_status = "initializing"
@@ -200,12 +1453,13 @@ def check_dashboard_status_handler(event):
             dashboard_status = "pending"
 
         dashboard_url = f"https://{dashboard_alb_dns}/"
+        retry_after = DASHBOARD_STATUS_RETRY_AFTER.get(dashboard_status)
 
         return respond(200, {
             "status": dashboard_status,
             "dashboardUrl": dashboard_url,
             "instanceId": instance_id
-        })
+        }, {"Retry-After": str(retry_after)} if retry_after else None)
 
     except Exception as e:
         print("Error in check_dashboard_status_handler:", str(e))
@@ -0,0 +1,94 @@
+resource "aws_cloudwatch_event_rule" "report_created" {
+  name        = "prowler-report-created"
+  description = "Catch new Prowler CSV reports in the report bucket"
+  event_pattern = jsonencode({
+    source      = ["aws.s3"],
+    detail-type = ["Object Created"],
+    detail = {
+      bucket = {
+        name = [aws_s3_bucket.prowler_bucket.id]
+      }
+      object = {
+        key = [{ prefix = local.report_csv_prefix }]
+      }
+    }
+  })
+}
+
+module "lambda_report_index" {
+  source = "git::https://github.com/wearetechnative/terraform-aws-lambda.git?ref=b9da56ded8f437adde4fe9819fb292050c7ee515"
+
+  name              = "report_index_lambda"
+  role_arn          = module.iam_role_lambda_report_index.role_arn
+  role_arn_provided = true
+  kms_key_arn       = var.kms_key_arn
+
+  handler     = "lambda_function.lambda_handler"
+  memory_size = 128
+  timeout     = 60
+  runtime     = "python3.13"
+  layers      = [aws_lambda_layer_version.shared.arn]
+
+  source_type               = "local"
+  source_directory_location = "${path.module}/report_index_lambda/"
+  source_file_name          = null
+
+  environment_variables = {
+    REPORT_INDEX_PREFIX    = local.report_index_prefix
+    REPORT_FILENAME_PREFIX = "prowler-output-"
+  }
+
+  sqs_dlq_arn = var.dlq_arn
+}
+
+resource "aws_cloudwatch_event_target" "report_created" {
+  rule      = aws_cloudwatch_event_rule.report_created.name
+  target_id = "IndexLatestReport"
+  arn       = module.lambda_report_index.lambda_function_arn
+}
+
+resource "aws_lambda_permission" "report_created" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_report_index.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.report_created.arn
+}
+
+module "iam_role_lambda_report_index" {
+  source = "git::https://github.com/wearetechnative/terraform-aws-iam-role.git?ref=377cfce5febad930cb61097cd61c5a3f3f8925fd"
+
+  role_name = "report_index_lambda_role"
+  role_path = "/"
+
+  customer_managed_policies = {
+    "report_index" : jsondecode(data.aws_iam_policy_document.report_index.json)
+  }
+
+  trust_relationship = {
+    "lambda" : { "identifier" : "lambda.amazonaws.com", "identifier_type" : "Service", "enforce_mfa" : false, "enforce_userprincipal" : false, "external_id" : null, "prevent_account_confuseddeputy" : false }
+  }
+}
+
+data "aws_iam_policy_document" "report_index" {
+  statement {
+    sid = "ListReportBucket"
+    actions = [
+      "s3:ListBucket"
+    ]
+    resources = [
+      aws_s3_bucket.prowler_bucket.arn
+    ]
+  }
+
+  statement {
+    sid = "ReadWriteReportIndex"
+    actions = [
+      "s3:GetObject",
+      "s3:PutObject"
+    ]
+    resources = [
+      "${aws_s3_bucket.prowler_bucket.arn}/${local.report_index_prefix}*"
+    ]
+  }
+}
@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import re
+
+from botocore.exceptions import ClientError
+
+from aws_clients import client
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+report_index_prefix = os.environ.get("REPORT_INDEX_PREFIX", "index/latest/")
+report_filename_prefix = os.environ.get("REPORT_FILENAME_PREFIX", "prowler-output-")
+report_filename_suffix = os.environ.get("REPORT_FILENAME_SUFFIX", ".csv")
+
+s3 = client("s3")
+
+account_pattern = re.compile(rf"^{re.escape(report_filename_prefix)}(\d+)-")
+
+
+def _normalize_prefix(prefix: str) -> str:
+    if not prefix:
+        return ""
+    return prefix if prefix.endswith("/") else prefix + "/"
+
+
+def _index_key(account: str) -> str:
+    return f"{_normalize_prefix(report_index_prefix)}{account}.json"
+
+
+def _parse_account(key: str) -> str | None:
+    if not key.lower().endswith(report_filename_suffix.lower()):
+        return None
+    match = account_pattern.match(key.rsplit("/", 1)[-1])
+    return match.group(1) if match else None
+
+
+def _read_entry(bucket: str, account: str) -> dict | None:
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=_index_key(account))
+        return json.loads(obj["Body"].read())
+    except s3.exceptions.NoSuchKey:
+        return None
+    except (ClientError, ValueError) as exc:
+        logger.warning("Unable to read index entry for account %s: %s", account, exc)
+        return None
+
+
+def update_index(bucket: str, key: str, last_modified: str) -> bool:
+    """Record ``key`` as the latest report of its account unless a newer one is indexed."""
+    account = _parse_account(key)
+    if not account:
+        logger.info("Object %s is not a Prowler report; skipping.", key)
+        return False
+
+    current = _read_entry(bucket, account)
+    if current and current.get("last_modified", "") > last_modified:
+        logger.info(
+            "Index for account %s already points at newer report %s",
+            account,
+            current.get("key"),
+        )
+        return False
+
+    entry = {"account": account, "key": key, "last_modified": last_modified}
+    s3.put_object(
+        Bucket=bucket,
+        Key=_index_key(account),
+        Body=json.dumps(entry).encode("utf-8"),
+        ContentType="application/json",
+    )
+    logger.info("Indexed report %s for account %s", key, account)
+    return True
+
+
+def lambda_handler(event, context):
+    logger.info("Received event: %s", json.dumps(event))
+
+    detail = event.get("detail", {})
+    bucket = detail.get("bucket", {}).get("name")
+    key = detail.get("object", {}).get("key")
+    if not bucket or not key:
+        return {"statusCode": 400, "body": json.dumps("Missing bucket or object key.")}
+
+    updated = update_index(bucket, key, event.get("time", ""))
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"indexed": updated, "key": key})
+    }
@@ -0,0 +1,157 @@
+resource "aws_dynamodb_table" "report_merges" {
+  name         = "prowler_report_merges"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "merge_key"
+
+  attribute {
+    name = "merge_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
+
+module "lambda_report_merge" {
+  source = "git::https://github.com/wearetechnative/terraform-aws-lambda.git?ref=b9da56ded8f437adde4fe9819fb292050c7ee515"
+
+  name              = "report_merge_lambda"
+  role_arn          = module.iam_role_lambda_report_merge.role_arn
+  role_arn_provided = true
+  kms_key_arn       = var.kms_key_arn
+
+  handler     = "lambda_function.lambda_handler"
+  memory_size = 256
+  timeout     = 600
+  runtime     = "python3.13"
+  layers      = [aws_lambda_layer_version.shared.arn]
+
+  source_type               = "local"
+  source_directory_location = "${path.module}/report_merge_lambda/"
+  source_file_name          = null
+
+  environment_variables = {
+    REPORT_BUCKET          = aws_s3_bucket.prowler_bucket.id
+    REPORT_CSV_PREFIX      = local.report_csv_prefix
+    REPORT_FILENAME_PREFIX = "prowler-output-"
+    MERGE_TABLE            = aws_dynamodb_table.report_merges.name
+    SCAN_REGION_GROUPS     = jsonencode({ for prefix, scan in local.scan_region_groups : prefix => scan if scan.groups > 0 })
+  }
+
+  sqs_dlq_arn = var.dlq_arn
+}
+
+# Region group tasks stop like any other scan task; the merge Lambda ignores the others.
+resource "aws_cloudwatch_event_target" "report_merge" {
+  rule      = aws_cloudwatch_event_rule.failed_task.name
+  target_id = "MergeRegionGroupReports"
+  arn       = module.lambda_report_merge.lambda_function_arn
+}
+
+resource "aws_lambda_permission" "report_merge" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_report_merge.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.failed_task.arn
+}
+
+resource "aws_cloudwatch_event_rule" "merge_timed_out" {
+  name                = "prowler-merge-timed-out-scans"
+  description         = "Merge account scans whose region groups did not all report"
+  schedule_expression = "rate(15 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "merge_timed_out" {
+  rule      = aws_cloudwatch_event_rule.merge_timed_out.name
+  target_id = "MergeTimedOutScans"
+  arn       = module.lambda_report_merge.lambda_function_arn
+  input     = jsonencode({ action = "merge-timed-out" })
+}
+
+resource "aws_lambda_permission" "merge_timed_out" {
+  statement_id  = "AllowTimedOutMergeFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_report_merge.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.merge_timed_out.arn
+}
+
+resource "aws_cloudwatch_event_rule" "account_scan_merged" {
+  name        = "prowler-account-scan-merged"
+  description = "Notify about account scans merged from region group tasks"
+  event_pattern = jsonencode({
+    source      = ["prowler.scan"],
+    detail-type = ["Prowler Account Scan Merged"]
+  })
+}
+
+resource "aws_cloudwatch_event_target" "account_scan_merged" {
+  rule      = aws_cloudwatch_event_rule.account_scan_merged.name
+  target_id = "NotifyOnMergedScan"
+  arn       = module.lambda_prowler_failed_task.lambda_function_arn
+}
+
+resource "aws_lambda_permission" "account_scan_merged" {
+  statement_id  = "AllowMergedScanFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_prowler_failed_task.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.account_scan_merged.arn
+}
+
+module "iam_role_lambda_report_merge" {
+  source = "git::https://github.com/wearetechnative/terraform-aws-iam-role.git?ref=377cfce5febad930cb61097cd61c5a3f3f8925fd"
+
+  role_name = "report_merge_lambda_role"
+  role_path = "/"
+
+  customer_managed_policies = {
+    "report_merge" : jsondecode(data.aws_iam_policy_document.report_merge.json)
+  }
+
+  trust_relationship = {
+    "lambda" : { "identifier" : "lambda.amazonaws.com", "identifier_type" : "Service", "enforce_mfa" : false, "enforce_userprincipal" : false, "external_id" : null, "prevent_account_confuseddeputy" : false }
+  }
+}
+
+data "aws_iam_policy_document" "report_merge" {
+  statement {
+    sid = "ListReportBucket"
+    actions = [
+      "s3:ListBucket"
+    ]
+    resources = [
+      aws_s3_bucket.prowler_bucket.arn
+    ]
+  }
+
+  statement {
+    sid = "ReadPartsWriteReports"
+    actions = [
+      "s3:GetObject",
+      "s3:PutObject"
+    ]
+    resources = [
+      "${aws_s3_bucket.prowler_bucket.arn}/${local.report_csv_prefix}*"
+    ]
+  }
+
+  statement {
+    sid = "TrackRegionGroups"
+    actions = [
+      "dynamodb:PutItem",
+      "dynamodb:UpdateItem",
+      "dynamodb:Scan"
+    ]
+    resources = [aws_dynamodb_table.report_merges.arn]
+  }
+
+  statement {
+    sid       = "AnnounceMergedScans"
+    actions   = ["events:PutEvents"]
+    resources = ["arn:aws:events:${var.region}:${data.aws_caller_identity.current.account_id}:event-bus/default"]
+  }
+}
@@ -0,0 +1,291 @@
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+from aws_clients import client, table
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+report_bucket = os.environ["REPORT_BUCKET"]
+csv_prefix = os.environ.get("REPORT_CSV_PREFIX", "output/csv/")
+report_filename_prefix = os.environ.get("REPORT_FILENAME_PREFIX", "prowler-output-")
+part_filename_prefix = os.environ.get("PART_FILENAME_PREFIX", "prowler-part-")
+merge_table_name = os.environ["MERGE_TABLE"]
+# Family prefix of each region-split scan -> {"scan": name, "groups": region group count}.
+scan_region_groups = json.loads(os.environ.get("SCAN_REGION_GROUPS", "{}"))
+run_window_seconds = int(os.environ.get("RUN_WINDOW_SECONDS", "3600"))
+merge_timeout_seconds = int(os.environ.get("MERGE_TIMEOUT_SECONDS", str(6 * 3600)))
+merge_ttl_seconds = int(os.environ.get("MERGE_TTL_SECONDS", str(7 * 24 * 3600)))
+event_source = os.environ.get("EVENT_SOURCE", "prowler.scan")
+
+MERGE_TIMED_OUT_ACTION = "merge-timed-out"
+MERGED_DETAIL_TYPE = "Prowler Account Scan Merged"
+FINDINGS_EXIT_CODE = 3
+# Job ids are created by the API Lambda with uuid4().hex.
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+PART_FAMILY_PATTERN = re.compile(r"^part(\d+)-(\d+)$")
+
+# Parts that do not complete a scan never create the EventBridge client.
+s3 = client("s3")
+events = client("events")
+# AWS_ENDPOINT_URL_DYNAMODB points this at DynamoDB Local.
+merge_table = table(merge_table_name)
+
+
+def _normalize_prefix(prefix: str) -> str:
+    if not prefix:
+        return ""
+    return prefix if prefix.endswith("/") else prefix + "/"
+
+
+def _part_key(account: str, group: int) -> str:
+    return f"{_normalize_prefix(csv_prefix)}{part_filename_prefix}{account}-{group}.csv"
+
+
+def _parse_part(task_definition_arn: str) -> tuple[dict, str, int] | None:
+    """Return (scan settings, account, region group) of a region group task."""
+    family = task_definition_arn.rsplit("/", 1)[-1].rpartition(":")[0]
+    for prefix, settings in scan_region_groups.items():
+        if not family.startswith(prefix):
+            continue
+        match = PART_FAMILY_PATTERN.match(family[len(prefix):])
+        if match:
+            return settings, match.group(2), int(match.group(1))
+    return None
+
+
+def _epoch(timestamp: str | None) -> int:
+    if not timestamp:
+        return int(time.time())
+    return int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+
+
+def _merge_key(detail: dict, scan_name: str, account: str) -> str:
+    """All region group tasks of one account scan share this scan id."""
+    started_by = detail.get("startedBy") or ""
+    if JOB_ID_PATTERN.match(started_by):
+        run = f"job-{started_by}"
+    else:
+        run = f"run-{_epoch(detail.get('createdAt')) // run_window_seconds * run_window_seconds}"
+    return f"{scan_name}#{account}#{run}"
+
+
+def _is_conditional_failure(exc: ClientError) -> bool:
+    return exc.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def record_part(merge_key: str, settings: dict, account: str, group: int, part: dict) -> dict:
+    """Store the result of one region group task and return the updated scan."""
+    try:
+        return merge_table.update_item(
+            Key={"merge_key": merge_key},
+            UpdateExpression="SET parts.#group = :part",
+            ConditionExpression="attribute_exists(merge_key)",
+            ExpressionAttributeNames={"#group": str(group)},
+            ExpressionAttributeValues={":part": part},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]
+    except ClientError as exc:
+        if not _is_conditional_failure(exc):
+            raise
+
+    now = int(time.time())
+    item = {
+        "merge_key": merge_key,
+        "scan": settings["scan"],
+        "account": account,
+        "expected": int(settings["groups"]),
+        "parts": {str(group): part},
+        "created_at": now,
+        "expires_at": now + merge_ttl_seconds,
+    }
+    try:
+        merge_table.put_item(Item=item, ConditionExpression="attribute_not_exists(merge_key)")
+        return item
+    except ClientError as exc:
+        if not _is_conditional_failure(exc):
+            raise
+    return record_part(merge_key, settings, account, group, part)
+
+
+def claim_merge(merge_key: str) -> dict | None:
+    try:
+        return merge_table.update_item(
+            Key={"merge_key": merge_key},
+            UpdateExpression="SET merged_at = :now",
+            ConditionExpression="attribute_exists(merge_key) AND attribute_not_exists(merged_at)",
+            ExpressionAttributeValues={":now": int(time.time())},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]
+    except ClientError as exc:
+        if _is_conditional_failure(exc):
+            return None
+        raise
+
+
+def _resolve_delimiter(header_line: str) -> str:
+    return ";" if header_line.count(";") > header_line.count(",") else ","
+
+
+def merge_parts(account: str, groups: int, started_at: int) -> tuple[str | None, list[int]]:
+    """Concatenate the part reports of an account into one report.
+
+    Parts older than the scan are left over from an earlier run and skipped.
+    Rows are streamed through a temporary file, so memory use does not grow
+    with the report size. Returns the merged report key and the missing groups.
+    """
+    missing = []
+    with tempfile.TemporaryFile() as raw:
+        out = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        writer = None
+        header = None
+        for group in range(groups):
+            try:
+                obj = s3.get_object(Bucket=report_bucket, Key=_part_key(account, group))
+            except s3.exceptions.NoSuchKey:
+                missing.append(group)
+                continue
+            if obj["LastModified"].timestamp() < started_at:
+                obj["Body"].close()
+                missing.append(group)
+                continue
+
+            text = io.TextIOWrapper(obj["Body"], encoding="utf-8-sig", newline="")
+            header_line = text.readline()
+            if not header_line:
+                continue
+            delimiter = _resolve_delimiter(header_line)
+            reader = csv.reader(itertools.chain([header_line], text), delimiter=delimiter)
+            part_header = next(reader)
+            if header is None:
+                header = part_header
+                writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+                writer.writerow(header)
+            if part_header == header:
+                writer.writerows(row for row in reader if row)
+            else:
+                # Map columns by name when a part was written by another Prowler version.
+                positions = {name: index for index, name in enumerate(part_header)}
+                writer.writerows(
+                    [row[positions[name]] if positions.get(name, len(row)) < len(row) else "" for name in header]
+                    for row in reader
+                    if row
+                )
+
+        if header is None:
+            return None, missing
+
+        out.flush()
+        out.detach()
+        raw.seek(0)
+        timestamp = datetime.fromtimestamp(started_at, timezone.utc).strftime("%Y%m%d%H%M%S")
+        merged_key = f"{_normalize_prefix(csv_prefix)}{report_filename_prefix}{account}-{timestamp}.csv"
+        s3.upload_fileobj(raw, report_bucket, merged_key)
+    return merged_key, missing
+
+
+def _scan_exit_code(parts: dict) -> int | None:
+    codes = [int(part["exit_code"]) for part in parts.values() if part.get("exit_code") is not None]
+    if FINDINGS_EXIT_CODE in codes:
+        return FINDINGS_EXIT_CODE
+    return max(codes, default=None)
+
+
+def complete_scan(merge_key: str) -> dict | None:
+    """Merge the parts of an account scan once and announce the merged report."""
+    scan = claim_merge(merge_key)
+    if scan is None:
+        logger.info("Scan %s was already merged", merge_key)
+        return None
+
+    parts = scan.get("parts", {})
+    started_at = min(int(part["created_at"]) for part in parts.values())
+    report_key, missing = merge_parts(scan["account"], int(scan["expected"]), started_at)
+    missing = sorted(set(missing) | {g for g in range(int(scan["expected"])) if str(g) not in parts})
+
+    detail = {
+        "scanName": scan["scan"],
+        "account": scan["account"],
+        "scanId": merge_key,
+        "exitCode": _scan_exit_code(parts),
+        "reportKey": report_key,
+        "missingRegionGroups": missing,
+        "startedBy": next((p.get("started_by") for p in parts.values() if p.get("started_by")), None),
+        "createdAt": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+    }
+    events.put_events(Entries=[{
+        "Source": event_source,
+        "DetailType": MERGED_DETAIL_TYPE,
+        "Detail": json.dumps(detail),
+    }])
+    logger.info("Merged scan %s into %s (missing region groups: %s)", merge_key, report_key, missing)
+    return detail
+
+
+def merge_timed_out() -> dict:
+    """Merge account scans that are still waiting for region groups after the timeout."""
+    cutoff = int(time.time()) - merge_timeout_seconds
+    kwargs = {
+        "FilterExpression": "attribute_not_exists(merged_at) AND created_at <= :cutoff",
+        "ExpressionAttributeValues": {":cutoff": cutoff},
+        "ProjectionExpression": "merge_key",
+    }
+    keys = []
+    while True:
+        page = merge_table.scan(**kwargs)
+        keys.extend(item["merge_key"] for item in page.get("Items", []))
+        if "LastEvaluatedKey" not in page:
+            break
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+    merged = [key for key in keys if complete_scan(key)]
+    return {"timedOut": keys, "merged": merged}
+
+
+def lambda_handler(event, context):
+    logger.info("Received event: %s", json.dumps(event))
+
+    if event.get("action") == MERGE_TIMED_OUT_ACTION:
+        return merge_timed_out()
+
+    detail = event.get("detail", {})
+    parsed = _parse_part(detail.get("taskDefinitionArn", ""))
+    if parsed is None:
+        return {"statusCode": 200, "body": json.dumps("Not a region group task; skipped.")}
+    settings, account, group = parsed
+
+    exit_codes = [c.get("exitCode") for c in detail.get("containers", []) if c.get("exitCode") is not None]
+    part = {
+        "exit_code": FINDINGS_EXIT_CODE if FINDINGS_EXIT_CODE in exit_codes else next(iter(exit_codes), None),
+        "task_arn": detail.get("taskArn"),
+        "started_by": detail.get("startedBy"),
+        "created_at": _epoch(detail.get("createdAt")),
+    }
+    merge_key = _merge_key(detail, settings["scan"], account)
+    scan = record_part(merge_key, settings, account, group, part)
+    logger.info(
+        "Recorded region group %d of %s (%d of %s)",
+        group,
+        merge_key,
+        len(scan.get("parts", {})),
+        scan.get("expected"),
+    )
+
+    merged = None
+    if len(scan.get("parts", {})) >= int(scan.get("expected", 0)):
+        merged = complete_scan(merge_key)
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"scanId": merge_key, "merged": merged})
+    }
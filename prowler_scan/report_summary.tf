@@ -0,0 +1,77 @@
+# Shares its source directory with the failed task notifier for the report parser.
+module "lambda_report_summary" {
+  source = "git::https://github.com/wearetechnative/terraform-aws-lambda.git?ref=b9da56ded8f437adde4fe9819fb292050c7ee515"
+
+  name              = "report_summary_lambda"
+  role_arn          = module.iam_role_lambda_report_summary.role_arn
+  role_arn_provided = true
+  kms_key_arn       = var.kms_key_arn
+
+  handler     = "report_summary.lambda_handler"
+  memory_size = 128
+  timeout     = 300
+  runtime     = "python3.13"
+  layers      = [aws_lambda_layer_version.shared.arn]
+
+  source_type               = "local"
+  source_directory_location = "${path.module}/failed_task_lambda/"
+  source_file_name          = null
+
+  environment_variables = {
+    REPORT_SUMMARY_PREFIX  = local.report_summary_prefix
+    REPORT_FILENAME_PREFIX = "prowler-output-"
+  }
+
+  sqs_dlq_arn = var.dlq_arn
+}
+
+resource "aws_cloudwatch_event_target" "report_summary" {
+  rule      = aws_cloudwatch_event_rule.report_created.name
+  target_id = "SummarizeReport"
+  arn       = module.lambda_report_summary.lambda_function_arn
+}
+
+resource "aws_lambda_permission" "report_summary" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = module.lambda_report_summary.lambda_function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.report_created.arn
+}
+
+module "iam_role_lambda_report_summary" {
+  source = "git::https://github.com/wearetechnative/terraform-aws-iam-role.git?ref=377cfce5febad930cb61097cd61c5a3f3f8925fd"
+
+  role_name = "report_summary_lambda_role"
+  role_path = "/"
+
+  customer_managed_policies = {
+    "report_summary" : jsondecode(data.aws_iam_policy_document.report_summary.json)
+  }
+
+  trust_relationship = {
+    "lambda" : { "identifier" : "lambda.amazonaws.com", "identifier_type" : "Service", "enforce_mfa" : false, "enforce_userprincipal" : false, "external_id" : null, "prevent_account_confuseddeputy" : false }
+  }
+}
+
+data "aws_iam_policy_document" "report_summary" {
+  statement {
+    sid = "ReadReports"
+    actions = [
+      "s3:GetObject"
+    ]
+    resources = [
+      "${aws_s3_bucket.prowler_bucket.arn}/${local.report_csv_prefix}*"
+    ]
+  }
+
+  statement {
+    sid = "WriteSummaries"
+    actions = [
+      "s3:PutObject"
+    ]
+    resources = [
+      "${aws_s3_bucket.prowler_bucket.arn}/${local.report_summary_prefix}*"
+    ]
+  }
+}
@@ -21,6 +21,18 @@ resource "aws_s3_bucket_lifecycle_configuration" "reports" {
     }
     status = "Enabled"
   }
+  # Index entries are rewritten with every report, so an entry this old points
+  # at a report the rule above has already expired.
+  rule {
+    id = "index-retention"
+    filter {
+      prefix = local.report_index_prefix
+    }
+    expiration {
+      days = var.report_retention
+    }
+    status = "Enabled"
+  }
 }
 
 resource "aws_s3_bucket_public_access_block" "public_access_block" {
@@ -59,4 +71,8 @@ data "aws_iam_policy_document" "allow_getobject_from_other_accounts" {
       "${aws_s3_bucket.prowler_bucket.arn}/mutelist/*",
     ]
   }
-}
\ No newline at end of file
+}
+resource "aws_s3_bucket_notification" "reports" {
+  bucket      = aws_s3_bucket.prowler_bucket.id
+  eventbridge = true
+}
@@ -0,0 +1,49 @@
+"""boto3 clients shared by the Lambda functions.
+
+Clients are created on first use and reused while the container is warm, so an
+invocation only pays for the clients its code path calls. This module is
+shipped to every Lambda in the shared layer (see lambda_layer.tf).
+"""
+
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+# Standard retries back off on throttling and keepalive lets warm invocations
+# reuse connections. Lambdas that fan out calls over a thread pool raise
+# AWS_MAX_POOL_CONNECTIONS to the size of the pool.
+boto_config = Config(
+    retries={"max_attempts": int(os.environ.get("AWS_MAX_ATTEMPTS", "3")), "mode": "standard"},
+    connect_timeout=int(os.environ.get("AWS_CONNECT_TIMEOUT", "5")),
+    read_timeout=int(os.environ.get("AWS_READ_TIMEOUT", "30")),
+    tcp_keepalive=True,
+    max_pool_connections=int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "10")),
+)
+_client_lock = threading.Lock()
+
+
+class LazyClient:
+    """A boto3 client or resource created by ``factory`` on first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+
+    def __getattr__(self, name):
+        if self._instance is None:
+            with _client_lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return getattr(self._instance, name)
+
+
+def client(service: str, config: Config | None = None) -> LazyClient:
+    """A lazy client; ``config`` overrides settings of the shared config for this client only."""
+    merged = boto_config.merge(config) if config else boto_config
+    return LazyClient(lambda: boto3.client(service, config=merged))
+
+
+def table(name: str) -> LazyClient:
+    return LazyClient(lambda: boto3.resource("dynamodb", config=boto_config).Table(name))
@@ -58,6 +58,13 @@ variable "prowler_scans" {
     prowler_account_list         = list(string)
     compliance_checks            = list(string)
     severity                     = list(string)
+    parallel_regions             = optional(bool, false)
+    region_groups                = optional(list(list(string)), [])
+    account_sizes = optional(map(object({
+      cpu    = string
+      memory = string
+    })), {})
+    auto_sizing = optional(bool, false)
   }))
 }
 
@@ -87,6 +94,76 @@ variable "dashboard_uptime" {
   default     = "1h"
 }
 
+variable "dashboard_warm_pool" {
+  description = "Stop the dashboard instance after dashboard_uptime instead of terminating it, and start it again on the next launch (idle cost is EBS only)"
+  type        = bool
+  default     = false
+}
+
+variable "dashboard_report_scope" {
+  description = "Reports the dashboard instance downloads at boot: all, latest (latest report per account) or days (reports of the last dashboard_report_days days)"
+  type        = string
+  default     = "all"
+
+  validation {
+    condition     = contains(["all", "latest", "days"], var.dashboard_report_scope)
+    error_message = "dashboard_report_scope must be one of all, latest or days."
+  }
+}
+
+variable "dashboard_report_days" {
+  description = "Number of days of reports to download when dashboard_report_scope is days"
+  type        = number
+  default     = 7
+}
+
+variable "scan_concurrency" {
+  description = "Maximum number of scan tasks running at once when a scan is started from the frontend (0 for no limit); the other accounts are queued"
+  type        = number
+  default     = 0
+}
+
+variable "critical_accounts" {
+  description = "Account IDs that are scanned first when a scan is started from the frontend"
+  type        = list(string)
+  default     = []
+}
+
+variable "run_task_concurrency" {
+  description = "Maximum number of concurrent ECS RunTask calls when starting a scan"
+  type        = number
+  default     = 10
+}
+
+variable "auto_sizing_max_cpu" {
+  description = "Largest Fargate CPU size, in CPU units, that auto_sizing gives a task"
+  type        = number
+  default     = 4096
+
+  validation {
+    condition     = contains([256, 512, 1024, 2048, 4096, 8192, 16384], var.auto_sizing_max_cpu)
+    error_message = "auto_sizing_max_cpu must be a Fargate CPU size: 256, 512, 1024, 2048, 4096, 8192 or 16384."
+  }
+}
+
+variable "notify_only_changes" {
+  description = "Only email findings that are new or resolved since the previous scan of an account"
+  type        = bool
+  default     = true
+}
+
+variable "notification_batching" {
+  description = "Send one digest per scan run instead of one email per account with findings"
+  type        = bool
+  default     = true
+}
+
+variable "notification_batch_timeout" {
+  description = "Seconds to wait for all tasks of a scan run before sending its digest anyway"
+  type        = number
+  default     = 21600
+}
+
 variable "mutelist" {
   description = "Contents of the mutelist yaml file"
   type        = string